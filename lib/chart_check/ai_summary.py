@@ -19,6 +19,8 @@ from __future__ import annotations
 # ============================================================
 import json
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from io import BytesIO
 from typing import Dict, List, Tuple, Any
 
@@ -48,6 +50,8 @@ AI_SUMMARY_COLUMNS = [
     "後テキスト",
 ]
 
+_SENT_END_RE = re.compile(r"[。．！？!?]")
+
 
 # ============================================================
 # sentence split
@@ -124,6 +128,36 @@ def _limit_next_text(text: str, max_chars: int) -> str:
     return s[:max_chars]
 
 
+# ============================================================
+# sentence offsets（頁テキスト単位でキャッシュ）
+# ============================================================
+@lru_cache(maxsize=256)
+def _sentence_offsets(page_text: str) -> Tuple[List[int], List[int]]:
+    """
+    頁テキストを文単位に区切り、(開始offset一覧, 終了offset一覧) を返す。
+    空白だけの文は除外する。
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+
+    start = 0
+
+    for m in _SENT_END_RE.finditer(page_text):
+        end = m.end()
+
+        if page_text[start:end].strip():
+            starts.append(start)
+            ends.append(end)
+
+        start = end
+
+    if page_text[start:].strip():
+        starts.append(start)
+        ends.append(len(page_text))
+
+    return starts, ends
+
+
 # ============================================================
 # 前文・参照文・後文を抽出
 # ============================================================
@@ -147,42 +181,16 @@ def extract_prev_current_next_text(
     page_text = str(pages_text[page_idx] or "")
 
     # ------------------------------------------------------------
-    # sentence spans
+    # sentence spans（頁ごとに1回だけ計算し、本文は offset で切り出す）
     # ------------------------------------------------------------
-    sent_spans = []
-
-    start = 0
-
-    for m in re.finditer(r"[。．！？!?]", page_text):
-        end = m.end()
-
-        sent = page_text[start:end].strip()
-
-        if sent:
-            sent_spans.append(
-                {
-                    "start": start,
-                    "end": end,
-                    "text": sent,
-                }
-            )
-
-        start = end
-
-    rest = page_text[start:].strip()
-
-    if rest:
-        sent_spans.append(
-            {
-                "start": start,
-                "end": len(page_text),
-                "text": rest,
-            }
-        )
+    starts, ends = _sentence_offsets(page_text)
 
-    if not sent_spans:
+    if not starts:
         return "", str(ref_text or ""), ""
 
+    def _sent(i: int) -> str:
+        return page_text[starts[i]:ends[i]].strip()
+
     hit_idx = None
 
     # ------------------------------------------------------------
@@ -194,10 +202,9 @@ def extract_prev_current_next_text(
         ms = -1
 
     if ms >= 0:
-        for i, sp in enumerate(sent_spans):
-            if sp["start"] <= ms < sp["end"]:
-                hit_idx = i
-                break
+        i = bisect_right(starts, ms) - 1
+        if i >= 0 and ms < ends[i]:
+            hit_idx = i
 
     # ------------------------------------------------------------
     # fallback
@@ -206,8 +213,8 @@ def extract_prev_current_next_text(
         target_line = str(line_text or "").strip()
 
         if target_line:
-            for i, sp in enumerate(sent_spans):
-                sent = sp["text"]
+            for i in range(len(starts)):
+                sent = _sent(i)
 
                 if target_line in sent or sent in target_line:
                     hit_idx = i
@@ -221,37 +228,17 @@ def extract_prev_current_next_text(
         key = str(figure_key or "").strip()
 
         if ref_piece:
-            for i, sp in enumerate(sent_spans):
-                if ref_piece in sp["text"]:
+            for i in range(len(starts)):
+                if ref_piece in _sent(i):
                     hit_idx = i
                     break
 
         if hit_idx is None and key:
             key_core = base_key(key)
 
-            for i, sp in enumerate(sent_spans):
-                sent = sp["text"]
-
-                if key in sent or key_core in sent:
-                    hit_idx = i
-                    break
-
-
-
-    if hit_idx is None:
-        ref_piece = _first_text_piece(ref_text)
-        key = str(figure_key or "").strip()
-
-        if ref_piece:
-            for i, sent in enumerate(sentences):
-                if ref_piece in sent:
-                    hit_idx = i
-                    break
+            for i in range(len(starts)):
+                sent = _sent(i)
 
-        if hit_idx is None and key:
-            key_core = base_key(key)
-
-            for i, sent in enumerate(sentences):
                 if key in sent or key_core in sent:
                     hit_idx = i
                     break
@@ -259,9 +246,9 @@ def extract_prev_current_next_text(
     if hit_idx is None:
         return "", str(line_text or ref_text or ""), ""
 
-    prev_text = sent_spans[hit_idx - 1]["text"] if hit_idx - 1 >= 0 else ""
-    current_text = sent_spans[hit_idx]["text"]
-    next_text = sent_spans[hit_idx + 1]["text"] if hit_idx + 1 < len(sent_spans) else ""
+    prev_text = _sent(hit_idx - 1) if hit_idx - 1 >= 0 else ""
+    current_text = _sent(hit_idx)
+    next_text = _sent(hit_idx + 1) if hit_idx + 1 < len(starts) else ""
 
     return prev_text, current_text, next_text
 
@@ -275,15 +262,28 @@ def _caption_info_by_key(df_captions: pd.DataFrame) -> Dict[str, Dict[str, Any]]
     if df_captions.empty or "図表キー" not in df_captions.columns:
         return info
 
-    for key, grp in df_captions.groupby("図表キー"):
-        g = grp.sort_values("pdf_page") if "pdf_page" in grp.columns else grp
-        row = g.iloc[0]
-
+    # ------------------------------------------------------------
+    # key ごとの先頭行：pdf_page で安定ソート → drop_duplicates
+    # ------------------------------------------------------------
+    df = df_captions.dropna(subset=["図表キー"])
+    if "pdf_page" in df.columns:
+        df = df.sort_values("pdf_page", kind="mergesort")
+    df = df.drop_duplicates(subset=["図表キー"], keep="first").sort_values("図表キー", kind="mergesort")
+
+    def _col(name: str, default: Any) -> List[Any]:
+        return df[name].tolist() if name in df.columns else [default] * len(df)
+
+    for key, title, label, pdf_page in zip(
+        df["図表キー"].tolist(),
+        _col("見出しタイトル", ""),
+        _col("page_label", ""),
+        _col("pdf_page", ""),
+    ):
         info[str(key)] = {
             "図表キー": str(key),
-            "図表タイトル": row.get("見出しタイトル", "") or "",
-            "頁": row.get("page_label", "") or "",
-            "pdf頁": row.get("pdf_page", ""),
+            "図表タイトル": title or "",
+            "頁": label or "",
+            "pdf頁": pdf_page,
         }
 
     return info
@@ -298,8 +298,22 @@ def _refs_by_base_key(df_refs: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
     if df_refs.empty or "図表キー" not in df_refs.columns:
         return refs
 
-    for _, row in df_refs.iterrows():
-        key = str(row.get("図表キー", "") or "")
+    # ------------------------------------------------------------
+    # iterrows は使わず，列ごとの list を zip で回す
+    # ------------------------------------------------------------
+    def _col(name: str, default: Any) -> List[Any]:
+        return df_refs[name].tolist() if name in df_refs.columns else [default] * len(df_refs)
+
+    for key_raw, page_label, pdf_page, ref_text, line_text, match_start, match_end in zip(
+        df_refs["図表キー"].tolist(),
+        _col("page_label", ""),
+        _col("pdf_page", ""),
+        _col("参照テキスト", ""),
+        _col("行テキスト", ""),
+        _col("match_start", None),
+        _col("match_end", None),
+    ):
+        key = str(key_raw or "")
         if not key:
             continue
 
@@ -308,12 +322,12 @@ def _refs_by_base_key(df_refs: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
         refs.setdefault(bk, []).append(
             {
                 "図表キー": key,
-                "参照頁ラベル": row.get("page_label", "") or "",
-                "参照pdf頁": row.get("pdf_page", "") or "",
-                "参照テキスト": row.get("参照テキスト", "") or "",
-                "行テキスト": row.get("行テキスト", "") or "",
-                "match_start": row.get("match_start", None),
-                "match_end": row.get("match_end", None),
+                "参照頁ラベル": page_label or "",
+                "参照pdf頁": pdf_page or "",
+                "参照テキスト": ref_text or "",
+                "行テキスト": line_text or "",
+                "match_start": match_start,
+                "match_end": match_end,
             }
         )
 
@@ -509,6 +523,42 @@ def build_ai_summary_frames(
     }
 
 
+# ============================================================
+# AI用frames → xlsx / jsonl bytes
+# ============================================================
+def ai_summary_frames_to_xlsx_bytes(frames: Dict[str, pd.DataFrame]) -> bytes:
+    output = BytesIO()
+
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        frames["図サマリー"].to_excel(writer, sheet_name="図サマリー", index=False)
+        frames["表サマリー"].to_excel(writer, sheet_name="表サマリー", index=False)
+        frames["図表サマリー"].to_excel(writer, sheet_name="図表サマリー", index=False)
+        frames["見出しなし参照"].to_excel(writer, sheet_name="見出しなし参照", index=False)
+
+    return output.getvalue()
+
+
+def ai_summary_frames_to_jsonl_bytes(frames: Dict[str, pd.DataFrame]) -> bytes:
+    lines = []
+
+    for sheet_name, df in frames.items():
+        if df.empty:
+            continue
+
+        for row in df.to_dict(orient="records"):
+            item = {
+                "sheet": sheet_name,
+                **row,
+            }
+            lines.append(json.dumps(item, ensure_ascii=False, default=str))
+
+    text = "\n".join(lines)
+    if text:
+        text += "\n"
+
+    return text.encode("utf-8")
+
+
 # ============================================================
 # AI用xlsx bytes生成
 # ============================================================
@@ -528,15 +578,7 @@ def build_ai_summary_xlsx_bytes(
         next_text_max_chars=next_text_max_chars,
     )
 
-    output = BytesIO()
-
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        frames["図サマリー"].to_excel(writer, sheet_name="図サマリー", index=False)
-        frames["表サマリー"].to_excel(writer, sheet_name="表サマリー", index=False)
-        frames["図表サマリー"].to_excel(writer, sheet_name="図表サマリー", index=False)
-        frames["見出しなし参照"].to_excel(writer, sheet_name="見出しなし参照", index=False)
-
-    return output.getvalue()
+    return ai_summary_frames_to_xlsx_bytes(frames)
 
 
 # ============================================================
@@ -558,21 +600,4 @@ def build_ai_summary_jsonl_bytes(
         next_text_max_chars=next_text_max_chars,
     )
 
-    lines = []
-
-    for sheet_name, df in frames.items():
-        if df.empty:
-            continue
-
-        for row in df.to_dict(orient="records"):
-            item = {
-                "sheet": sheet_name,
-                **row,
-            }
-            lines.append(json.dumps(item, ensure_ascii=False, default=str))
-
-    text = "\n".join(lines)
-    if text:
-        text += "\n"
-
-    return text.encode("utf-8")
\ No newline at end of file
+    return ai_summary_frames_to_jsonl_bytes(frames)
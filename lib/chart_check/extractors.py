@@ -59,42 +59,56 @@ except Exception:
 
 PARTICLES_RE = re2.compile(r"(?:に|を|は|へ|で|と|の|など|等|または|又は|および|及び|かつ)")
 
+# 「図表番号の直後（空白可）に助詞・接続語が続くか」の判定用（マッチごとに組み立てない）
+PARTICLE_FOLLOW_RE = re2.compile(rf"\s*{PARTICLES_RE.pattern}")
+
 
 # ============================================================
 # 番号正規化
 # ============================================================
-def canon_num(num: str) -> str:
-    # ------------------------------------------------------------
-    # 全角数字・全角括弧 → 半角
-    # ------------------------------------------------------------
-    s = num.translate(str.maketrans("０１２３４５６７８９（）", "0123456789()"))
+# 全角数字・全角括弧 → 半角，ドット類 → "."，ハイフン類 → "-" を 1 回の translate で行う
+# （DOT / HY の各文字と同じ集合）
+_CANON_NUM_TABLE = str.maketrans(
+    "０１２３４５６７８９（）"
+    "．・･"
+    "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\uFF0D\u30FC",
+    "0123456789()"
+    "..."
+    "---------",
+)
 
-    # ------------------------------------------------------------
-    # ドット類 → "."
-    # ------------------------------------------------------------
-    s = re.sub(DOT, ".", s)
+# canon_num の空白調整（呼び出しごとにパターンを引かない）
+_DOT_SPACES_RE = re.compile(r"\s*\.\s*")
+_HY_SPACES_RE = re.compile(r"\s*-\s*")
+_MULTI_SPACES_RE = re.compile(r"[ \u3000]+")
+_PAREN_OPEN_SPACES_RE = re.compile(r"\(\s*")
+_PAREN_CLOSE_SPACES_RE = re.compile(r"\s*\)")
 
+# 図表番号の直後に続く区切り記号（タイトル文字列の先頭から除く）
+CAPTION_LEAD_RE = re.compile(r"^[\s:：.\-．、・]+")
+
+def canon_num(num: str) -> str:
     # ------------------------------------------------------------
-    # ハイフン類 → "-"
+    # 全角数字・全角括弧 → 半角，ドット類 → "."，ハイフン類 → "-"
     # ------------------------------------------------------------
-    s = re.sub(HY, "-", s)
+    s = num.translate(_CANON_NUM_TABLE)
 
     # ------------------------------------------------------------
     # "." と "-" の前後スペース削除
     # ------------------------------------------------------------
-    s = re.sub(r"\s*\.\s*", ".", s)
-    s = re.sub(r"\s*-\s*", "-", s)
+    s = _DOT_SPACES_RE.sub(".", s)
+    s = _HY_SPACES_RE.sub("-", s)
 
     # ------------------------------------------------------------
     # 複数スペース → 1個
     # ------------------------------------------------------------
-    s = re.sub(r"[ \u3000]+", " ", s)
+    s = _MULTI_SPACES_RE.sub(" ", s)
 
     # ------------------------------------------------------------
     # 括弧内スペース削除
     # ------------------------------------------------------------
-    s = re.sub(r"\(\s*", "(", s)
-    s = re.sub(r"\s*\)", ")", s)
+    s = _PAREN_OPEN_SPACES_RE.sub("(", s)
+    s = _PAREN_CLOSE_SPACES_RE.sub(")", s)
 
     return s.strip()
 
@@ -109,10 +123,9 @@ def canon_label(kind: str, num: str) -> str:
 # ============================================================
 # マッチを含む行を抽出
 # ============================================================
-def extract_line_covering_match(full: str, start: int, end: int) -> Tuple[int, str, int, int]:
+def _line_bounds(full: str, start: int, end: int) -> Tuple[str, int, int]:
     """
-    マッチを必ず含む行を返す。
-    改行またぎ対策として、match start/end から行範囲を復元する。
+    match start/end を含む行の (行テキスト, 行開始位置, 行終了位置) を返す。
     """
     line_start = full.rfind("\n", 0, start)
     line_start = 0 if line_start == -1 else line_start + 1
@@ -122,6 +135,16 @@ def extract_line_covering_match(full: str, start: int, end: int) -> Tuple[int, s
         line_end = len(full)
 
     line_txt = full[line_start:line_end].rstrip("\r\n")
+
+    return line_txt, line_start, line_end
+
+
+def extract_line_covering_match(full: str, start: int, end: int) -> Tuple[int, str, int, int]:
+    """
+    マッチを必ず含む行を返す。
+    改行またぎ対策として、match start/end から行範囲を復元する。
+    """
+    line_txt, line_start, line_end = _line_bounds(full, start, end)
     approx_lineno = full.count("\n", 0, line_start) + 1
 
     return approx_lineno, line_txt, line_start, line_end
@@ -143,19 +166,36 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
     captions: List[Dict[str, Any]] = []
     refs: List[Dict[str, Any]] = []
 
+    # ------------------------------------------------------------
+    # 「図」「表」を含まないページは正規表現を走らせずに終了
+    # （EXTRACT_RE は必ずどちらかの文字から始まる）
+    # ------------------------------------------------------------
+    if "図" not in page_text and "表" not in page_text:
+        return captions, refs
+
     full = page_text.replace("\r\n", "\n").replace("\r", "\n")
 
+    # ------------------------------------------------------------
+    # 行番号は前回マッチ位置からの改行数を足し込んで求める
+    # （マッチごとにページ先頭から数え直さない）
+    # ------------------------------------------------------------
+    counted_pos = 0
+    lineno = 1
+
     for m in EXTRACT_RE.finditer(full):
         kind = m.group("kind")
         num = m.group("num")
         raw = m.group(0)
 
-        lineno, line_txt, line_start, line_end = extract_line_covering_match(
+        line_txt, line_start, line_end = _line_bounds(
             full,
             m.start(),
             m.end(),
         )
 
+        lineno += full.count("\n", counted_pos, line_start)
+        counted_pos = line_start
+
         # ------------------------------------------------------------
         # タイトル / 参照 判定
         # ------------------------------------------------------------
@@ -163,7 +203,7 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         rel_end = (m.start() - line_start) + len(raw)
         after_on_line = line_txt[rel_end:] if rel_end <= len(line_txt) else ""
 
-        particle_follow = bool(re2.match(rf"\s*{PARTICLES_RE.pattern}", after_on_line))
+        particle_follow = bool(PARTICLE_FOLLOW_RE.match(after_on_line))
         # has_period = "。" in line_txt
         has_period = ("。" in line_txt) or ("．" in line_txt)
 
@@ -172,11 +212,13 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         # ------------------------------------------------------------
         # 表示用：強調行 / excerpt
         # ------------------------------------------------------------
-        highlighted = line_txt.replace(raw, f"⟪{raw}⟫", 1)
+        # 強調表記は 1 回だけ作り，excerpt は前後の切り出しと 1 回の文字列組み立てで作る
+        marked = f"⟪{raw}⟫"
+        highlighted = line_txt.replace(raw, marked, 1)
 
-        left = max(0, m.start() - ctx)
-        right = min(len(full), m.end() + ctx)
-        excerpt = full[left:m.start()] + f"⟪{raw}⟫" + full[m.end():right]
+        m_start, m_end = m.span()
+        left = max(0, m_start - ctx)
+        excerpt = f"{full[left:m_start]}{marked}{full[m_end:m_end + ctx]}"
 
         # ------------------------------------------------------------
         # 本文参照
@@ -209,7 +251,7 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         # 図表タイトル
         # ------------------------------------------------------------
         else:
-            title = re.sub(r"^[\s:：.\-．、・]+", "", after_on_line).strip()
+            title = CAPTION_LEAD_RE.sub("", after_on_line).strip()
 
             captions.append(
                 {
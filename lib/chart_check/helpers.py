@@ -41,24 +41,28 @@ def index_pages_by_key(
 ) -> Dict[str, List[int]]:
     """
     DataFrame から key_col ごとに pdf_page の一覧を集約して返す。
+    行ごとの iterrows は使わず，列演算＋groupby で集約する。
     """
-    from collections import defaultdict
-
-    idx = defaultdict(set)
-    if df is None or df.empty or key_col not in df.columns:
+    if df is None or df.empty or key_col not in df.columns or "pdf_page" not in df.columns:
         return {}
 
-    for _, row in df.iterrows():
-        k = row.get(key_col)
-        p = row.get("pdf_page")
+    pairs = df[[key_col, "pdf_page"]].dropna()
+    pages = pd.to_numeric(pairs["pdf_page"], errors="coerce")
+    pairs = pairs.assign(
+        **{
+            key_col: pairs[key_col].astype(str),
+            "pdf_page": pages,
+        }
+    ).dropna(subset=["pdf_page"])
+
+    pairs["pdf_page"] = pairs["pdf_page"].astype(int)
+    pairs = pairs.drop_duplicates().sort_values("pdf_page", kind="mergesort")
 
-        if pd.notna(k) and pd.notna(p):
-            try:
-                idx[str(k)].add(int(p))
-            except Exception:
-                pass
+    idx: Dict[str, List[int]] = {}
+    for k, p in zip(pairs[key_col].tolist(), pairs["pdf_page"].tolist()):
+        idx.setdefault(k, []).append(p)
 
-    return {k: sorted(v) for k, v in idx.items()}
+    return idx
 
 
 # ============================================================
@@ -207,6 +211,61 @@ def first_caption_row(
     }
 
 
+# ============================================================
+# 参照集約の共通処理
+# ============================================================
+def _join_unique_by_base(
+    df_sorted: pd.DataFrame,
+    col: str,
+    sep: str,
+    bases: pd.Index,
+    *,
+    as_int: bool = False,
+) -> Dict[str, str]:
+    """
+    ソート済み DataFrame の col を _base ごとに重複除去（出現順）して sep で連結する。
+    値が 1 件もないベースキーは空文字にする。
+    """
+    pairs = df_sorted[["_base", col]].dropna(subset=[col])
+
+    values = pairs[col].astype(int) if as_int else pairs[col]
+    pairs = pairs.assign(**{col: values.astype(str)})
+    pairs = pairs.drop_duplicates(["_base", col])
+
+    joined = pairs.groupby("_base", sort=False)[col].agg(sep.join)
+
+    return joined.reindex(bases, fill_value="").to_dict()
+
+
+def _aggregate_refs_by_base(
+    df_refs: pd.DataFrame,
+    base_key_func,
+):
+    """
+    参照をベースキー単位に集約し，
+    頁ラベル / pdf頁 / 行テキスト / 行テキスト(強調) の 4 辞書を返す。
+
+    グループごとに sort_values / unique を回さず，
+    (_base, pdf_page, 行番号) の一括ソート＋drop_duplicates で処理する。
+    """
+    df = df_refs.copy()
+    df["_base"] = df["図表キー"].map(base_key_func)
+    df = df.sort_values(
+        ["_base", "pdf_page", "行番号"],
+        na_position="last",
+        kind="mergesort",
+    )
+
+    bases = pd.Index(df["_base"].unique())
+
+    return (
+        _join_unique_by_base(df, "page_label", ",", bases),
+        _join_unique_by_base(df, "pdf_page", ",", bases, as_int=True),
+        _join_unique_by_base(df, "行テキスト", " | ", bases),
+        _join_unique_by_base(df, "行テキスト(強調)", " | ", bases),
+    )
+
+
 # ============================================================
 # 画面表示用：参照集約
 # ============================================================
@@ -224,27 +283,7 @@ def ref_aggregate_for_view(
     if df_refs is None or df_refs.empty:
         return {}, {}, {}, {}
 
-    df = df_refs.copy()
-    df["_base"] = df["図表キー"].map(base_key_func)
-
-    ref_lbls, ref_pdfs, ref_texts, ref_hi = {}, {}, {}, {}
-
-    for base, grp in df.groupby("_base"):
-        grp2 = grp.sort_values(
-            ["pdf_page", "行番号"],
-            kind="mergesort",
-        )
-        lbls = grp2["page_label"].dropna().astype(str).unique().tolist()
-        pnums = grp2["pdf_page"].dropna().astype(int).unique().tolist()
-        texts = grp2["行テキスト"].dropna().astype(str).unique().tolist()
-        his = grp2["行テキスト(強調)"].dropna().astype(str).unique().tolist()
-
-        ref_lbls[base] = ",".join(lbls)
-        ref_pdfs[base] = ",".join(str(x) for x in pnums)
-        ref_texts[base] = " | ".join(texts)
-        ref_hi[base] = " | ".join(his)
-
-    return ref_lbls, ref_pdfs, ref_texts, ref_hi
+    return _aggregate_refs_by_base(df_refs, base_key_func)
 
 
 # ============================================================
@@ -263,19 +302,36 @@ def caption_info_first_by_key(
     if df_cap is None or df_cap.empty:
         return info
 
-    page_map: Dict[int, str] = {
-        int(r["pdf_page"]): (r["page_label"] if r["page_label"] != "-" else "")
-        for _, r in df_pages.iterrows()
-        if pd.notna(r["pdf_page"])
-    }
+    page_map: Dict[int, str] = {}
+    if not df_pages.empty:
+        pages = df_pages.dropna(subset=["pdf_page"])
+        page_map = {
+            int(p): (lab if lab != "-" else "")
+            for p, lab in zip(pages["pdf_page"].tolist(), pages["page_label"].tolist())
+        }
+
+    # ------------------------------------------------------------
+    # key ごとの先頭行：pdf_page で安定ソート → drop_duplicates
+    # （groupby ごとの sort_values / iloc を使わない）
+    # ------------------------------------------------------------
+    firsts = (
+        df_cap.dropna(subset=["図表キー"])
+        .sort_values("pdf_page", kind="mergesort")
+        .drop_duplicates(subset=["図表キー"], keep="first")
+        .sort_values("図表キー", kind="mergesort")
+    )
+
+    titles = (
+        firsts["見出しタイトル"].tolist()
+        if "見出しタイトル" in firsts.columns
+        else [""] * len(firsts)
+    )
 
-    for k, grp in df_cap.groupby("図表キー"):
-        row = grp.sort_values("pdf_page").iloc[0]
-        pdfp = row.get("pdf_page")
+    for k, pdfp, title in zip(firsts["図表キー"].tolist(), firsts["pdf_page"].tolist(), titles):
         corrected_label = page_map.get(int(pdfp), "") if pd.notna(pdfp) else ""
 
         info[str(k)] = {
-            "図表タイトル": row.get("見出しタイトル", "") or "",
+            "図表タイトル": title or "",
             "頁": corrected_label,
             "pdf頁": int(pdfp) if pd.notna(pdfp) else "",
         }
@@ -299,40 +355,7 @@ def aggregate_ref_info(
     if df_refs is None or df_refs.empty:
         return {}, {}, {}, {}
 
-    df = df_refs.copy()
-    df["_base"] = df["図表キー"].map(base_key_func)
-
-    ref_page_labels: Dict[str, str] = {}
-    ref_pdf_pages: Dict[str, str] = {}
-    ref_texts: Dict[str, str] = {}
-    ref_highlight_texts: Dict[str, str] = {}
-
-    for base, grp in df.groupby("_base"):
-        grp2 = grp.sort_values(
-            ["pdf_page", "行番号"],
-            na_position="last",
-            kind="mergesort",
-        )
-
-        labels = [
-            str(x)
-            for x in grp2["page_label"].dropna().unique().tolist()
-        ]
-        pdfs = [
-            str(int(x))
-            for x in grp2["pdf_page"].dropna().unique().tolist()
-        ]
-
-        ref_page_labels[base] = ",".join(labels)
-        ref_pdf_pages[base] = ",".join(pdfs)
-        ref_texts[base] = " | ".join(
-            grp2["行テキスト"].dropna().astype(str).unique().tolist()
-        )
-        ref_highlight_texts[base] = " | ".join(
-            grp2["行テキスト(強調)"].dropna().astype(str).unique().tolist()
-        )
-
-    return ref_page_labels, ref_pdf_pages, ref_texts, ref_highlight_texts
+    return _aggregate_refs_by_base(df_refs, base_key_func)
 
 
 # ============================================================
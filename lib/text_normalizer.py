@@ -12,6 +12,7 @@
 
 from __future__ import annotations
 import re
+from functools import lru_cache
 
 # =========================
 # 定数
@@ -21,7 +22,43 @@ HY = r"[\-\u2010\u2011\u2012\u2013\u2014\u2015\u2212\uFF0D\u30FC]"  # 各種ハ
 # リーダーに使われがちな点/中点/箇条書き点も含めて広めに
 # - 追加：·(U+00B7), •(U+2022), ∙(U+2219)
 LEADER_CHARS_CLASS = r"[\.．・･…‧｡·•∙]"
-LEADERS_SPACED = rf"(?:\s*{LEADER_CHARS_CLASS}\s*){{3,}}"
+# 「点の前後の空白」を (?:\s*点\s*){3,} と書くと，点と点の間の空白を前後どちらの
+# \s* が取るかで分け方が指数的に増え，末尾以外にリーダーがある行で照合が止まらなくなる。
+# 空白は点の手前でだけ取り，最後にまとめて末尾の空白を取る（一致する文字列は同じ）
+LEADERS_SPACED = rf"(?:\s*{LEADER_CHARS_CLASS}){{3,}}\s*"
+
+# 正規化で使う正規表現（呼び出しごとにパターン文字列を組み立てない）
+_LEADERS_TAIL_STRICT_RE = re.compile(rf"\s*{LEADERS_SPACED}\s*$")
+_LEADERS_TAIL_LOOSE_RE = re.compile(rf"{LEADERS_SPACED}$")
+_SPACES_RE = re.compile(r"[ \t]+")
+
+# 同じ行・番号が何度も正規化されるため，結果をメモ化する件数
+NORMALIZE_CACHE_SIZE = 65536
+# ページ本文のような長い文字列はメモ化しない（キャッシュに本文全体が残り続けるため）
+NORMALIZE_CACHE_MAX_LEN = 512
+
+# 全角スペース・全角数字/括弧/ピリオド類・各種ハイフン/長音を
+# 1 回の translate でまとめて置換する（呼び出しごとに作り直さない）
+# ハイフン類は HY と同じ文字集合
+_Z2H_TABLE = str.maketrans({
+    "\u3000": " ",
+    "０": "0", "１": "1", "２": "2", "３": "3", "４": "4",
+    "５": "5", "６": "6", "７": "7", "８": "8", "９": "9",
+    "（": "(", "）": ")",
+    "［": "[", "］": "]",
+    "｛": "{", "｝": "}",
+    "．": ".",
+    "｡": ".",
+    **{ch: "-" for ch in "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\uFF0D\u30FC"},
+})
+
+# dict の表だと translate は 1 文字ごとに辞書を引くため，非 ASCII の行では遅い。
+# 置換対象の最大コードポイントまでを 1 本の文字列にした表を引く（範囲外の文字はそのまま）
+_Z2H_DENSE_TABLE = "".join(
+    _Z2H_TABLE.get(i, chr(i)) for i in range(max(_Z2H_TABLE) + 1)
+)
+# 置換対象を 1 文字も含まない行（漢字・かなだけの行など）は translate 自体を省く
+_Z2H_TARGET_RE = re.compile("[" + re.escape("".join(map(chr, _Z2H_TABLE))) + "]")
 
 
 # =========================
@@ -32,22 +69,21 @@ def z2h_numhy(s: str) -> str:
     全角数字/括弧/ピリオド類 → 半角、
     各種ハイフン/長音 → '-'
     """
-    s = (s or "").replace("\u3000", " ")
+    s = s or ""
+    # 置換対象はすべて非 ASCII なので，ASCII だけの文字列は走査せずそのまま返す
+    if s.isascii() or not _Z2H_TARGET_RE.search(s):
+        return s
+    return s.translate(_Z2H_DENSE_TABLE)
+
+
+def _normalize_strict(s: str) -> str:
+    s = z2h_numhy(s)
+    s = _LEADERS_TAIL_STRICT_RE.sub("", s)
+    s = _SPACES_RE.sub(" ", s)
+    return s.strip()
 
-    # translate の「元文字列」と「変換後文字列」は同じ長さである必要がある
-    # ここは明示的に 1:1 対応にする
-    trans = str.maketrans({
-        "０": "0", "１": "1", "２": "2", "３": "3", "４": "4",
-        "５": "5", "６": "6", "７": "7", "８": "8", "９": "9",
-        "（": "(", "）": ")",
-        "［": "[", "］": "]",
-        "｛": "{", "｝": "}",
-        "．": ".",
-        "｡": ".",
-    })
-    s = s.translate(trans)
 
-    return re.sub(HY, "-", s)
+_normalize_strict_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(_normalize_strict)
 
 
 def normalize_strict(s: str) -> str:
@@ -56,11 +92,21 @@ def normalize_strict(s: str) -> str:
       - 全角→半角
       - 終端リーダー（……・···など）削除
       - 空白圧縮
+    行単位の短い文字列だけメモ化し，ページ本文はその都度処理する。
     """
+    if s and len(s) > NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_strict(s)
+    return _normalize_strict_cached(s)
+
+
+def _normalize_loose(s: str) -> str:
     s = z2h_numhy(s)
-    s = re.sub(rf"\s*{LEADERS_SPACED}\s*$", "", s)
-    s = re.sub(r"[ \t]+", " ", s)
-    return s.strip()
+    s = _LEADERS_TAIL_LOOSE_RE.sub("", s)
+    # 空白削除は str.split() で行う（区切りの空白文字は正規表現の \s と同じ集合）
+    return "".join(s.split())
+
+
+_normalize_loose_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(_normalize_loose)
 
 
 def normalize_loose(s: str) -> str:
@@ -69,7 +115,8 @@ def normalize_loose(s: str) -> str:
       - 全角→半角
       - 空白削除
       - 終端リーダー軽除去
+    strict と同じく，行単位の短い文字列だけメモ化する。
     """
-    s = z2h_numhy(s)
-    s = re.sub(rf"{LEADERS_SPACED}$", "", s)
-    return re.sub(r"\s+", "", s)
+    if s and len(s) > NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_loose(s)
+    return _normalize_loose_cached(s)
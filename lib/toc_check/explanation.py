@@ -365,6 +365,8 @@ ON：
 
 - 頁ラベル一致が見つからない時に，
   全ページを再探索します。
+- 探索は直前のタイトルが見つかった頁の少し手前から始め，
+  最後まで見つからなければ先頭に戻って残りの頁を探します。
 
 OFF：
 
@@ -10,8 +10,14 @@
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Sequence, Union
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_right
+from functools import cached_property, lru_cache
+from itertools import accumulate, chain
+import io
+import os
 import re
 
 from ..text_normalizer import (
@@ -30,16 +36,67 @@ except Exception:
     pdfplumber = None
 
 
-def pdf_to_text_per_page(pdf_path: Path) -> List[str]:
-    texts: List[str] = []
+# 大きなPDFは頁範囲ごとに別プロセスで抽出する（小さなPDFはプロセス起動の方が高くつく）
+PARALLEL_MIN_PAGES = 64
+PARALLEL_MAX_WORKERS = 4
+
+
+def _fitz_page_text(page: Any) -> str:
+    # get_text("text") と同じフラグで TextPage を直接作り，平文だけ取り出す
+    # （出力形式の振り分けを経由しない）
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    return textpage.extractText() or ""
+
+
+def _fitz_open(src: Union[str, bytes]) -> Any:
+    # bytes はメモリ上のストリームとして開く（一時ファイルを経由しない）
+    if isinstance(src, (bytes, bytearray)):
+        return fitz.open(stream=src, filetype="pdf")
+    return fitz.open(src)
+
+
+def _fitz_page_range_text(src: Union[str, bytes], lo: int, hi: int) -> List[str]:
+    # ワーカー側：自前で PDF を開き，[lo, hi) の頁テキストを返す
+    with _fitz_open(src) as doc:
+        return [_fitz_page_text(doc[i]) for i in range(lo, hi)]
+
+
+def _fitz_text_per_page_parallel(src: Union[str, bytes], page_count: int, workers: int) -> List[str]:
+    step = -(-page_count // workers)
+    bounds = [(lo, min(lo + step, page_count)) for lo in range(0, page_count, step)]
+
+    with ProcessPoolExecutor(max_workers=len(bounds)) as ex:
+        futures = [ex.submit(_fitz_page_range_text, src, lo, hi) for lo, hi in bounds]
+        return [text for fut in futures for text in fut.result()]
+
+
+def pdf_to_text_per_page(pdf: Union[Path, str, bytes]) -> List[str]:
+    """
+    PDF をページ別テキストにする。
+    pdf にはファイルパスのほか，アップロードされた PDF の bytes をそのまま渡せる。
+    """
+    is_bytes = isinstance(pdf, (bytes, bytearray))
+
     if fitz is not None:
-        doc = fitz.open(str(pdf_path))
-        for p in doc:
-            texts.append(p.get_text("text") or "")
-    else:
-        with pdfplumber.open(str(pdf_path)) as pdf:
-            for p in pdf.pages:
-                texts.append(p.extract_text() or "")
+        src = bytes(pdf) if is_bytes else str(pdf)
+        with _fitz_open(src) as doc:
+            page_count = doc.page_count
+            workers = min(os.cpu_count() or 1, PARALLEL_MAX_WORKERS)
+            if page_count < PARALLEL_MIN_PAGES or workers < 2:
+                return [_fitz_page_text(p) for p in doc]
+
+        try:
+            return _fitz_text_per_page_parallel(src, page_count, workers)
+        except Exception:
+            # プロセス起動に失敗する環境では逐次抽出に戻す
+            return _fitz_page_range_text(src, 0, page_count)
+
+    texts: List[str] = []
+    with pdfplumber.open(io.BytesIO(pdf) if is_bytes else str(pdf)) as pdf:
+        for p in pdf.pages:
+            texts.append(p.extract_text() or "")
+            # 抽出済みページの pdfminer オブジェクトを解放し，ピークメモリを抑える
+            p.flush_cache()
     return texts
 
 
@@ -147,6 +204,12 @@ LABEL_TAIL_RE = build_label_tail_regex_mixed()
 LABEL_LINE_RE = build_label_line_regex_mixed()
 
 
+def _ends_with_digit(s: str) -> bool:
+    # ラベルはどの形式も数字で終わるため，前後空白を除いた行の末尾が数字でなければ
+    # 正規表現（行全体をなめて後戻りする）を走らせずに不一致と分かる
+    return s[-1:].isdigit()
+
+
 # ==== ページラベル専用の行判定（優先順位付きで使う） ====
 NUM = r"[0-9０-９]{1,6}"
 
@@ -165,6 +228,22 @@ PAGE_RANGE_RE = re.compile(
     rf"^\s*(?:p(?:age)?\.?\s*)?(?P<label>{NUM}\s*{HY}\s*{NUM})\s*$"
 )
 
+# 1)〜3) を 1 回の照合で判定する（どの形式に一致したかは lastgroup で分かる）
+# 1 行が複数の形式に同時に一致することはない
+PAGE_TOP_KINDS = ("single", "paren", "range")  # 優先順
+PAGE_TOP_RE = re.compile(
+    rf"^\s*(?:p(?:age)?\.?\s*)?"
+    rf"(?:"
+    rf"(?P<single>{NUM})"
+    rf"|[（(]\s*(?P<paren>{NUM})\s*[）)]"
+    rf"|(?P<range>{NUM}\s*{HY}\s*{NUM})"
+    rf")\s*$"
+)
+
+# ラベル候補は頁先頭の数行だけなので，頁全体ではなく先頭側だけを行分割する
+PAGE_HEAD_CHARS = 2048
+
+
 def extract_single_page_label(page_text: str) -> Tuple[Optional[str], Optional[str]]:
     """
     1ページ分のテキストから「頁ラベル」を 1 個だけ推定して返す。
@@ -185,17 +264,29 @@ def extract_single_page_label(page_text: str) -> Tuple[Optional[str], Optional[s
     if not page_text:
         return None, None
 
-    # 改行正規化
-    lines_raw = page_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
-    # normalize_strict をかけたものも併せて持っておく
-    lines_norm = [normalize_strict(raw) for raw in lines_raw]
-
-    # ─────────────────────────────
-    # 先頭の「完全な空行」（スペースだけ等）をスキップ
-    # ─────────────────────────────
-    start = 0
-    while start < len(lines_norm) and not lines_norm[start].strip():
-        start += 1
+    head_end = PAGE_HEAD_CHARS
+    while True:
+        # 改行正規化（\r\n / \r / \n を 1 パスで分割）
+        # 先頭 head_end 文字だけを分割し，途中で切れている可能性のある最終行は捨てる
+        truncated = len(page_text) > head_end
+        if truncated:
+            lines_raw = page_text[:head_end].splitlines()
+            lines_raw.pop()
+        else:
+            lines_raw = page_text.splitlines()
+
+        # ─────────────────────────────
+        # 先頭の「完全な空行」（スペースだけ等）をスキップ
+        # （normalize_strict は候補になる先頭側の行にだけかける）
+        # ─────────────────────────────
+        start = 0
+        while start < len(lines_raw) and not normalize_strict(lines_raw[start]).strip():
+            start += 1
+
+        # 候補 3 行が先頭部分に収まらない（空行が多い）ときだけ範囲を広げる
+        if not truncated or start + 3 <= len(lines_raw):
+            break
+        head_end *= 4
 
     if start >= len(lines_raw):
         # ページ全体が空行だけ
@@ -204,40 +295,26 @@ def extract_single_page_label(page_text: str) -> Tuple[Optional[str], Optional[s
     # ここから最大3行分だけをラベル候補として見る
     limit = min(3, len(lines_raw) - start)
     top_raw = lines_raw[start:start + limit]
-    top_norm = lines_norm[start:start + limit]
-
-    def _scan_top(pattern: re.Pattern) -> Tuple[Optional[str], Optional[str]]:
-        """
-        top_norm/top_raw の中から pattern にマッチする行を探す。
-        見つかったら (ラベル, 元行) を返す。
-        """
-        for raw, s in zip(top_raw, top_norm):
-            if not s:
-                continue
-            m = pattern.match(s)
-            if not m:
-                continue
-            label_raw = m.group("label")
-            # 数字・ハイフンを正規化（全角→半角，ハイフン統一など）
-            label = z2h_numhy(label_raw).strip()
-            if label:
-                return label, raw
-        return None, None
+    top_norm = [normalize_strict(raw) for raw in top_raw]
 
-    # 1) 単独数字
-    label, line = _scan_top(PAGE_SINGLE_RE)
-    if label is not None:
-        return label, line
-
-    # 2) 括弧付き単独数字
-    label, line = _scan_top(PAGE_PAREN_RE)
-    if label is not None:
-        return label, line
+    # 1) 単独数字 → 2) 括弧付き単独数字 → 3) 連番区間 の順に優先
+    # 各行は PAGE_TOP_RE で 1 回だけ照合し，優先度の最も高い形式の最初の行を採る
+    best: Optional[Tuple[int, str, str]] = None
+    for raw, s in zip(top_raw, top_norm):
+        if not s:
+            continue
+        m = PAGE_TOP_RE.match(s)
+        if not m:
+            continue
+        rank = PAGE_TOP_KINDS.index(m.lastgroup)
+        if best is None or rank < best[0]:
+            best = (rank, m.group(m.lastgroup), raw)
+            if rank == 0:
+                break
 
-    # 3) 連番区間
-    label, line = _scan_top(PAGE_RANGE_RE)
-    if label is not None:
-        return label, line
+    if best is not None:
+        # 数字・ハイフンを正規化（全角→半角，ハイフン統一など）
+        return z2h_numhy(best[1]).strip(), best[2]
 
     # 4) フォールバック：従来の LABEL_LINE_RE ロジック
     for raw, s in zip(top_raw, top_norm):
@@ -252,26 +329,36 @@ def extract_single_page_label(page_text: str) -> Tuple[Optional[str], Optional[s
 
 
 
+# ==== 目次行抽出用（呼び出しごとに組み立てない） ====
+TOC_HEAD_OK = (
+    r"\s*(?:"
+    r"序|資料|付録|第|添付資料|⚪︎|○|"
+    r"[0-9０-９]|"
+    r"\[|［|"
+    r"[（(][0-9０-９]{1,3}[）)]"
+    r")"
+)
+TOC_TEXT_CHAR = r"[A-Za-z\u3040-\u30FF\u4E00-\u9FFF]"
+
+# 行頭の書き出し判定・文字種判定・末尾ラベル抽出を 1 回の match で行う
+# （行頭/文字種は先読みにして LABEL_TAIL_RE の前に置く）
+TOC_LINE_RE = re.compile(
+    rf"(?={TOC_HEAD_OK})(?=.*?{TOC_TEXT_CHAR})" + LABEL_TAIL_RE.pattern,
+    re.X,
+)
+TOC_HEAD_LEADERS_RE = re.compile(rf"\s*{LEADERS_SPACED}\s*$")
+
+
 def extract_toc_lines(fulltext: str, limit: int) -> List[str]:
-    lines = [l.rstrip() for l in fulltext.replace("\r\n","\n").replace("\r","\n").split("\n")]
-    head_ok = re.compile(
-        r"^\s*(?:"
-        r"序|資料|付録|第|添付資料|⚪︎|○|"
-        r"[0-9０-９]|"
-        r"\[|［|"
-        r"[（(][0-9０-９]{1,3}[）)]"
-        r")"
-    )
-    text_char = re.compile(r"[A-Za-z\u3040-\u30FF\u4E00-\u9FFF]")
     out: List[str] = []
-    for ln in lines:
+    for ln in fulltext.splitlines():
         s = ln.strip()
-        if not s or not head_ok.match(s) or not text_char.search(s):
+        if not _ends_with_digit(s):
             continue
-        m = LABEL_TAIL_RE.match(s)
+        m = TOC_LINE_RE.match(s)
         if not m:
             continue
-        head  = re.sub(rf"\s*{LEADERS_SPACED}\s*$", "", m.group("head")).strip()
+        head  = TOC_HEAD_LEADERS_RE.sub("", m.group("head")).strip()
         label = z2h_numhy(m.group("label"))
         if len(head) <= 0:
             continue
@@ -281,6 +368,20 @@ def extract_toc_lines(fulltext: str, limit: int) -> List[str]:
     return out
 
 
+def extract_toc_lines_from_pages(pages_text: List[str], limit: int) -> List[str]:
+    """
+    頁テキストのリストから目次行を抽出する。
+    頁を連結せずに 1 頁ずつ走査し，limit 件に達したら残りの頁は分割しない。
+    （空行は読み飛ばすため，"\n" で連結してから抽出した結果と同じになる）
+    """
+    out: List[str] = []
+    for ptxt in pages_text:
+        out.extend(extract_toc_lines(ptxt, limit - len(out)))
+        if len(out) >= limit:
+            break
+    return out
+
+
 # ==== 章番号検出 & 照合 ====
 CHAP_HEAD_RE = re.compile(r'^\s*[0-9０-９]+(?:\s*' + HY + r'\s*[0-9０-９]+)+')
 
@@ -290,34 +391,161 @@ def extract_chap_head(s: str) -> Optional[str]:
         return None
     return z2h_numhy(m.group(0)).strip()
 
-def scan_lines_for_match(title_raw: str, body: str) -> Tuple[str, str]:
-    title_strict = normalize_strict(title_raw)
-    title_loose  = normalize_loose(title_raw)
+class PageLines:
+    """
+    1 頁分の行と，その行ごとの正規化結果。
+    正規化は初回参照時に 1 回だけ行い，同じ頁を複数タイトルで照合するときに使い回す。
+    """
+
+    def __init__(self, body: str):
+        self.body = body
+        self.lines = body.split("\n")
+        self._prefix_candidates: Dict[str, List[int]] = {}
+
+    @cached_property
+    def blank(self) -> List[bool]:
+        return [not ln.strip() for ln in self.lines]
+
+    @cached_property
+    def strict(self) -> List[str]:
+        return [normalize_strict(ln) for ln in self.lines]
+
+    @cached_property
+    def loose(self) -> List[str]:
+        return [normalize_loose(ln) for ln in self.lines]
+
+    @cached_property
+    def z2h(self) -> List[str]:
+        return [z2h_numhy(ln) for ln in self.lines]
+
+    @cached_property
+    def merged(self) -> List[str]:
+        # 2行結合窓（i 行目と i+1 行目）
+        lines = self.lines
+        return [normalize_strict(a + " " + b) for a, b in zip(lines, lines[1:])]
+
+    @cached_property
+    def strict_set(self) -> frozenset:
+        return frozenset(self.strict)
+
+    @cached_property
+    def loose_set(self) -> frozenset:
+        return frozenset(self.loose)
+
+    @cached_property
+    def merged_text(self) -> str:
+        # 2行結合窓を改行で連結したもの（タイトルは改行を含まないため，
+        # 「いずれかの窓に含まれる」を 1 回の部分文字列検索で判定できる）
+        return "\n".join(self.merged)
+
+    @cached_property
+    def line_starts(self) -> List[int]:
+        # 各行の先頭位置（本文中の位置 → 行番号の変換用）
+        return list(accumulate((len(ln) + 1 for ln in self.lines[:-1]), initial=0))
+
+    @cached_property
+    def label_only(self) -> List[bool]:
+        # ページラベルだけの単独行か
+        label_only = []
+        for ln in self.lines:
+            s = normalize_strict(ln.strip())
+            label_only.append(
+                _ends_with_digit(s) and LABEL_LINE_RE.fullmatch(s) is not None
+            )
+        return label_only
+
+    def prefix_candidates(self, probe: str) -> List[int]:
+        """
+        probe を含む行（空行・ページラベルだけの行を除く）の行番号。
+        先頭が同じタイトル（例：「第1章 概要」「第1章 背景」）で同じ probe を
+        使い回すため，頁ごとに probe 単位で結果を保持する。
+        """
+        found = self._prefix_candidates.get(probe)
+        if found is not None:
+            return found
+
+        # 本文全体で probe を探し，見つかった位置を行番号に戻す
+        # （一致した行の残りは飛ばして次の行から探し直す）
+        found = []
+        body = self.body
+        pos = body.find(probe) if "\n" not in probe else -1
+        if pos != -1:
+            blank = self.blank
+            starts = self.line_starts
+            n_lines = len(starts)
+            while pos != -1:
+                i = bisect_right(starts, pos) - 1
+                if not blank[i]:
+                    found.append(i)
+                if i + 1 >= n_lines:
+                    break
+                pos = body.find(probe, starts[i + 1])
+
+            if found:
+                label_only = self.label_only
+                found = [i for i in found if not label_only[i]]
+
+        self._prefix_candidates[probe] = found
+        return found
+
+
+TitleKeys = Tuple[str, str, Optional[re.Pattern]]
+
+
+def title_match_keys(title_raw: str) -> TitleKeys:
+    """
+    タイトル側の照合キー（strict / loose 正規化，章番号パターン）。
+    全ページ探索ではタイトルごとに 1 回だけ作り，頁ごとに作り直さない。
+    """
     chap = extract_chap_head(title_raw)
+    chap_re = (
+        re.compile(rf'(?<!\d){re.escape(chap)}(?!\s*{HY}\s*\d)') if chap else None
+    )
+    return normalize_strict(title_raw), normalize_loose(title_raw), chap_re
+
 
-    lines = body.split("\n")
+def scan_lines_for_match(
+    title_raw: str,
+    body: Union[str, PageLines],
+    keys: Optional[TitleKeys] = None,
+) -> Tuple[str, str]:
+    page = body if isinstance(body, PageLines) else PageLines(body)
+    body = page.body
+
+    title_strict, title_loose, chap_re = (
+        keys if keys is not None else title_match_keys(title_raw)
+    )
+
+    lines = page.lines
+    blank = page.blank
 
     # 行単位（強→弱）
-    for ln in lines:
-        if not ln.strip():
+    # 頁全体の集合・本文で一致の可能性がないと分かれば，行ごとの判定を省く
+    may_hit_line = (
+        chap_re is not None
+        or title_raw in body
+        or title_strict in page.strict_set
+        or title_loose in page.loose_set
+    )
+    strict = page.strict
+    loose = page.loose
+    z2h = page.z2h if chap_re is not None else None
+    for i, ln in enumerate(lines if may_hit_line else ()):
+        if blank[i]:
             continue
-        ln_strict = normalize_strict(ln)
-        if ln_strict == title_strict:
+        if strict[i] == title_strict:
             return "一致", ln.rstrip("\n")
-        ln_loose = normalize_loose(ln)
-        if ln_loose == title_loose:
+        if loose[i] == title_loose:
             return "一致（空白差吸収）", ln.rstrip("\n")
-        if chap:
-            ln_norm = z2h_numhy(ln)
-            pat = re.compile(rf'(?<!\d){re.escape(chap)}(?!\s*{HY}\s*\d)')
-            if pat.search(ln_norm):
-                return "一致（章番号）", ln.rstrip("\n")
+        if chap_re is not None and chap_re.search(z2h[i]):
+            return "一致（章番号）", ln.rstrip("\n")
         if title_raw in ln:
             return "一致（行内部分一致）", ln.rstrip("\n")
 
     # 2行結合窓
-    for i in range(len(lines) - 1):
-        merged = normalize_strict(lines[i] + " " + lines[i+1])
+    merged_text = page.merged_text
+    may_hit_merged = title_strict in merged_text or title_loose in merged_text
+    for i, merged in enumerate(page.merged if may_hit_merged else ()):
         if title_strict in merged or title_loose in merged:
             return "一致（改行越え）", lines[i] + " / " + lines[i+1]
 
@@ -332,7 +560,7 @@ def scan_lines_for_match(title_raw: str, body: str) -> Tuple[str, str]:
     #                 return f"部分一致（{klen}文字）", ln.rstrip("\n")
     # return "未検出", "-"
 
-    if chap:
+    if chap_re is not None:
         return "未検出", "-"
 
     # ------------------------------------------------------------
@@ -347,23 +575,28 @@ def scan_lines_for_match(title_raw: str, body: str) -> Tuple[str, str]:
     # 上記の場合，「資料 1-1」ではなく，
     # 「資料 1-1 調査票」を一致テキスト行として返す。
     # ------------------------------------------------------------
+    # 5/4 文字の接頭辞を含む行は必ず 3 文字の接頭辞も含むため，
+    # 最短の接頭辞で 1 回だけ候補行を絞り，各長さの判定は候補行だけで行う
+    # （ページラベルだけの単独行は除外）
+    probe = title_raw[:3]
+
+    if len(probe) < 3:
+        return "未検出", "-"
+
+    candidates = page.prefix_candidates(probe)
+
     for klen in (5, 4, 3):
         if len(title_raw) < klen:
             continue
 
         prefix = title_raw[:klen]
 
-        for ln in lines:
-            line_text = ln.strip()
-
-            if not line_text:
-                continue
-
-            # ページラベルだけの単独行は除外
-            line_normalized = normalize_strict(line_text)
+        # 頁本文に無い接頭辞は候補行を見るまでもない
+        if prefix not in body:
+            continue
 
-            if LABEL_LINE_RE.fullmatch(line_normalized):
-                continue
+        for i in candidates:
+            ln = lines[i]
 
             if prefix in ln:
                 return (
@@ -423,6 +656,22 @@ def build_segments(pages_text: List[str]) -> List[Dict[str, Any]]:
 #         return (n == pn + 1, "" if n == pn + 1 else "非連番")
 #     return True, ""
 
+# 単独数字（1）とハイフン付き数字（1-2，1-2-3）を 1 回の照合で判定する
+NUM_LABEL_RE = re.compile(r"[0-9]+(?:-[0-9]+)*")
+
+
+# シリーズ番号（資料1，資料 1，資料-1，資料．1，資料・1，資料2-1，図表-3，Appendix-1）
+SERIES_LABEL_RE = re.compile(
+    rf"^"
+    rf"(?P<series>{ALPHAJP})"
+    rf"(?:\s*(?:{HY}|[\.．・･])\s*|\s+)?"
+    rf"(?P<number>[0-9]+(?:\s*{HY}\s*[0-9]+)*)"
+    rf"$"
+)
+
+# 同じラベル（前頁の正常ラベルなど）は何度も解析されるため結果をメモ化する
+# （番号列はタプルで返し，キャッシュした値を呼び出し側で書き換えられないようにする）
+@lru_cache(maxsize=4096)
 def _parse_label_kind(label: str) -> Tuple[str, Any]:
     """
     ページラベルを判定用の種類と数値へ分解する。
@@ -440,48 +689,34 @@ def _parse_label_kind(label: str) -> Tuple[str, Any]:
     lab = z2h_numhy(label).strip()
 
     # ------------------------------------------------------------
-    # 単独数字
+    # 単独数字（最も多い形式なので正規表現を通さずに判定する）
     # ------------------------------------------------------------
-    if re.fullmatch(r"[0-9]+", lab):
+    if lab.isascii() and lab.isdigit():
         return "seq", int(lab)
 
     # ------------------------------------------------------------
-    # ハイフン付き数字
+    # ハイフン付き数字（先頭が数字でなければ照合しない）
     # ------------------------------------------------------------
-    if re.fullmatch(r"[0-9]+(?:-[0-9]+)+", lab):
-        parts = [int(value) for value in lab.split("-")]
-        return "chap", parts
+    if lab[:1].isdigit() and NUM_LABEL_RE.fullmatch(lab):
+        parts = lab.split("-")
+
+        if len(parts) == 1:
+            return "seq", int(lab)
+
+        return "chap", tuple(int(value) for value in parts)
 
     # ------------------------------------------------------------
-    # シリーズ番号
-    #
-    # 対応例：
-    # 資料1
-    # 資料 1
-    # 資料-1
-    # 資料．1
-    # 資料・1
-    # 資料2-1
-    # 図表-3
-    # Appendix-1
+    # シリーズ番号（SERIES_LABEL_RE）
     # ------------------------------------------------------------
-    series_pattern = re.compile(
-        rf"^"
-        rf"(?P<series>{ALPHAJP})"
-        rf"(?:\s*(?:{HY}|[\.．・･])\s*|\s+)?"
-        rf"(?P<number>[0-9]+(?:\s*{HY}\s*[0-9]+)*)"
-        rf"$"
-    )
-
-    match = series_pattern.fullmatch(lab)
+    match = SERIES_LABEL_RE.fullmatch(lab)
 
     if match:
         series_name = match.group("series").strip()
         number_text = z2h_numhy(match.group("number"))
-        number_parts = [
+        number_parts = tuple(
             int(value)
             for value in number_text.split("-")
-        ]
+        )
 
         return "series", (series_name, number_parts)
 
@@ -489,8 +724,8 @@ def _parse_label_kind(label: str) -> Tuple[str, Any]:
 
 
 def _is_next_number_parts(
-    current: List[int],
-    previous: List[int],
+    current: Sequence[int],
+    previous: Sequence[int],
 ) -> bool:
     """
     階層付き番号が自然に続いているかを確認する。
@@ -550,15 +785,34 @@ def valid_and_reason_auto(
     現在のページラベルが，直前の正常ラベルから
     自然に続いているかを確認する。
     """
-    kind, current = _parse_label_kind(label)
+    parsed = _parse_label_kind(label)
+
+    if parsed[0] == "unknown" or prev_ok is None:
+        return _valid_and_reason_parsed(parsed, None)
+
+    return _valid_and_reason_parsed(
+        parsed,
+        _parse_label_kind(prev_ok),
+    )
+
+
+def _valid_and_reason_parsed(
+    parsed: Tuple[str, Any],
+    prev_parsed: Optional[Tuple[str, Any]],
+) -> Tuple[bool, str]:
+    """
+    valid_and_reason_auto の判定本体。
+    _parse_label_kind 済みの値を受け取り，ラベル文字列の再解析をしない。
+    """
+    kind, current = parsed
 
     if kind == "unknown":
         return False, "不明なラベル形式"
 
-    if prev_ok is None:
+    if prev_parsed is None:
         return True, ""
 
-    prev_kind, previous = _parse_label_kind(prev_ok)
+    prev_kind, previous = prev_parsed
 
     if prev_kind == "unknown":
         return True, ""
@@ -620,35 +874,54 @@ def valid_and_reason_auto(
 
     return True, ""
 
-def validate_segments(segments: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Tuple[str,int]]]:
-    rows_check: List[Dict[str, Any]] = []
-    prev_ok: Optional[str] = None
-
-    for s in segments:
-        lab = s["page_label"]
-        if lab == "-":
-            rows_check.append({
-                "pdf_page": s["pdf_page"],
-                "page_label": lab,
-                "valid": False,
-                "reason": "ラベルなし",
-                "char_count": len(s["body"]),
-                "preview": s["body"][:100].replace("\n"," ") + ("…" if len(s["body"])>100 else "")
-            })
+
+def check_label_sequence(
+    labels: Sequence[Optional[str]],
+) -> List[Tuple[bool, str]]:
+    """
+    ページラベル列を先頭から順に連番チェックする。
+
+    - None / "-" はラベルなしとして (False, "ラベルなし") を返す
+    - 正常なラベルは reason を "" にそろえて返す
+    - 各ラベルの解析は1回だけで，直前の正常ラベルは解析済みの形で持ち回す
+    """
+    results: List[Tuple[bool, str]] = []
+    prev_parsed: Optional[Tuple[str, Any]] = None
+
+    for lab in labels:
+        if lab is None or lab == "-":
+            results.append((False, "ラベルなし"))
             continue
-        ok, reason = valid_and_reason_auto(lab, prev_ok)
+
+        parsed = _parse_label_kind(lab)
+        ok, reason = _valid_and_reason_parsed(parsed, prev_parsed)
         if ok:
-            prev_ok = lab
+            prev_parsed = parsed
+            reason = ""
+        results.append((ok, reason))
+
+    return results
+
+
+def validate_segments(segments: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Tuple[str,int]]]:
+    rows_check: List[Dict[str, Any]] = []
+    checks = check_label_sequence([s["page_label"] for s in segments])
+
+    for s, (ok, reason) in zip(segments, checks):
+        body = s["body"]
+        n_chars = len(body)
         rows_check.append({
             "pdf_page": s["pdf_page"],
-            "page_label": lab,
+            "page_label": s["page_label"],
             "valid": ok,
-            "reason": "" if ok else reason,
-            "char_count": len(s["body"]),
-            "preview": s["body"][:100].replace("\n"," ") + ("…" if len(s["body"])>100 else "")
+            "reason": reason,
+            "char_count": n_chars,
+            "preview": body[:100].replace("\n"," ") + ("…" if n_chars>100 else "")
         })
 
-    valid_segments = [s for s in segments if any(r["pdf_page"] == s["pdf_page"] and r["valid"] for r in rows_check)]
+    # 正常判定の頁番号を先に集めて引く（頁ごとに rows_check 全体を走査しない）
+    valid_pages = {r["pdf_page"] for r in rows_check if r["valid"]}
+    valid_segments = [s for s in segments if s["pdf_page"] in valid_pages]
     seg_index: Dict[str, Tuple[str,int]] = {
         s["page_label"]: (s["body"], s["pdf_page"])
         for s in valid_segments if s["page_label"] != "-"
@@ -657,6 +930,11 @@ def validate_segments(segments: List[Dict[str, Any]]) -> Tuple[List[Dict[str, An
 
 
 # ==== 目次 ↔ 本文 照合 ====
+# 全ページ探索は，直前のタイトルが見つかった頁の少し手前から始める
+# （目次は本文の順に並ぶため）。末尾まで見つからなければ先頭に戻って残りを探す。
+PAGE_SEARCH_BACKTRACK = 2
+
+
 def check_toc_by_order(
     toc_lines: List[str],
     seg_index: Dict[str, Tuple[str, int]],
@@ -664,6 +942,12 @@ def check_toc_by_order(
     search_all_pages: bool = False
 ) -> List[Dict[str, Any]]:
     out_rows: List[Dict[str, Any]] = []
+    # 頁ごとの行正規化はタイトル間で共有する（ラベル頁と全頁探索で本文が異なるため別管理）
+    label_page_lines: Dict[int, PageLines] = {}
+    all_page_lines: Dict[int, PageLines] = {}
+    n_pages = len(pages_text)
+    cursor = 0  # 全ページ探索の開始位置（0 始まり）
+
     for toc in toc_lines:
         if " ::: " not in toc:
             continue
@@ -674,22 +958,32 @@ def check_toc_by_order(
         status = "未検出"
         matched = "-"
         found_page_num: Optional[int] = None
+        keys = title_match_keys(title_raw)
 
         # 1) ラベル一致ページを優先
         if label in seg_index:
             body_for_label, page_no = seg_index[label]
-            stt, m = scan_lines_for_match(title_raw, body_for_label)
+            page = label_page_lines.get(page_no)
+            if page is None:
+                page = label_page_lines[page_no] = PageLines(body_for_label)
+            stt, m = scan_lines_for_match(title_raw, page, keys)
             if stt != "未検出":
                 status, matched, found_page_num = stt, m, page_no
 
         # 2) 必要なら全ページ探索
         if status == "未検出" and search_all_pages:
-            for i, ptxt in enumerate(pages_text):
-                stt, m = scan_lines_for_match(title_raw, ptxt)
+            for i in chain(range(cursor, n_pages), range(0, cursor)):
+                page = all_page_lines.get(i)
+                if page is None:
+                    page = all_page_lines[i] = PageLines(pages_text[i])
+                stt, m = scan_lines_for_match(title_raw, page, keys)
                 if stt != "未検出":
                     status, matched, found_page_num = stt, m, i + 1
                     break
 
+        if found_page_num is not None:
+            cursor = min(max(0, found_page_num - 1 - PAGE_SEARCH_BACKTRACK), n_pages)
+
         out_rows.append({
             "タイトル": title_raw,
             "目次頁ラベル": label,
@@ -21,8 +21,8 @@ from __future__ import annotations
 # ============================================================
 import io
 import sys
-import tempfile
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
 
 # ============================================================
 # imports（3rd party）
@@ -73,7 +73,7 @@ from common_lib.ui.input_source import render_input_source
 # ============================================================
 from lib.toc_check.toc_segments import (
     pdf_to_text_per_page,
-    extract_toc_lines,
+    extract_toc_lines_from_pages,
     build_segments,
     validate_segments,
     check_toc_by_order,
@@ -186,24 +186,122 @@ has_cached = (
 if (not run) and (not has_cached):
     st.stop()
 
+# ============================================================
+# helper：解析・照合（同一PDF・同一オプションの再実行はキャッシュ）
+# ============================================================
+# オプション切替やダウンロード操作による再実行では，
+# PDF 解析・目次抽出・ラベル検証・照合をやり直さない。
+# いずれも PDF bytes（と関係するオプション）だけで結果が決まる。
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    return pdf_to_text_per_page(pdf_bytes)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _extract_toc_lines(pdf_bytes: bytes, join_front: bool) -> List[str]:
+    pages_text = _pdf_to_pages_text(pdf_bytes)
+    front_n = min(10, len(pages_text))
+    sample_pages = pages_text[:front_n] if join_front else pages_text[:1]
+    return extract_toc_lines_from_pages(sample_pages, limit=120)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _build_and_validate_segments(
+    pdf_bytes: bytes,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Tuple[str, int]]]:
+    segments = build_segments(_pdf_to_pages_text(pdf_bytes))
+    rows_check, valid_segments, seg_index = validate_segments(segments)
+    return segments, rows_check, valid_segments, seg_index
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _check_toc_rows(
+    pdf_bytes: bytes,
+    join_front: bool,
+    search_all: bool,
+) -> List[Dict[str, Any]]:
+    _, _, _, seg_index = _build_and_validate_segments(pdf_bytes)
+    return check_toc_by_order(
+        toc_lines=_extract_toc_lines(pdf_bytes, join_front),
+        seg_index=seg_index,
+        pages_text=_pdf_to_pages_text(pdf_bytes),
+        search_all_pages=search_all,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _build_result_xlsx(
+    pdf_bytes: bytes,
+    join_front: bool,
+    search_all: bool,
+) -> bytes:
+    # 照合結果と同じキーでキャッシュし，再実行のたびに xlsxwriter で書き直さない
+    df_result = pd.DataFrame(_check_toc_rows(pdf_bytes, join_front, search_all))
+
+    xlsx_buf = io.BytesIO()
+    with pd.ExcelWriter(
+        xlsx_buf,
+        engine="xlsxwriter",
+        # 文字列セルごとの URL 自動判定を省略（本文テキスト列が多いため）
+        engine_kwargs={"options": {"strings_to_urls": False}},
+    ) as writer:
+        sheet = "result"
+        # ヘッダーは下で 1 回だけ書くため，本文のみ 2 行目から出力
+        df_result.to_excel(
+            writer,
+            index=False,
+            sheet_name=sheet,
+            header=False,
+            startrow=1,
+        )
+
+        wb = writer.book
+        ws = writer.sheets[sheet]
+
+        text_fmt = wb.add_format({"num_format": "@"})
+        header_fmt = wb.add_format({"bold": True})
+        wrap_fmt = wb.add_format({"text_wrap": True})
+
+        cols = list(df_result.columns)
+        ws.write_row(0, 0, cols, header_fmt)
+
+        col_specs = {
+            "タイトル": (28, None),
+            "目次頁ラベル": (16, text_fmt),
+            "pdf頁ラベル": (16, text_fmt),
+            "pdf頁": (10, None),
+            "判定": (12, None),
+            "一致テキスト行": (40, wrap_fmt),
+        }
+
+        # 隣接して同じ幅・書式の列は 1 回の set_column にまとめる
+        run_start = None
+        run_spec = None
+        for j, name in enumerate(cols + [None]):
+            spec = col_specs.get(name) if name is not None else None
+            if spec == run_spec:
+                continue
+            if run_spec is not None:
+                ws.set_column(run_start, j - 1, *run_spec)
+            run_start, run_spec = j, spec
+
+        ws.freeze_panes(1, 0)
+
+    return xlsx_buf.getvalue()
+
+
 # ============================================================
 # PDF 読み込み（ページごとテキスト化）
 # ============================================================
-with tempfile.TemporaryDirectory() as td:
-    pdf_path = Path(td) / "input.pdf"
-    pdf_path.write_bytes(
-        input_result.data_bytes
-    )
-    pages_text = pdf_to_text_per_page(pdf_path)
+pdf_bytes = input_result.data_bytes
+pages_text = _pdf_to_pages_text(pdf_bytes)
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
 # ============================================================
 # 1) 目次候補抽出
 # ============================================================
-front_n = min(10, len(pages_text))
-sample_text = "\n".join(pages_text[:front_n]) if toc_join_front else pages_text[0]
-toc_lines = extract_toc_lines(sample_text, limit=120)
+toc_lines = _extract_toc_lines(pdf_bytes, toc_join_front)
 
 st.subheader("抽出された目次候補（上位）")
 if not toc_lines:
@@ -214,28 +312,26 @@ st.code("\n".join(toc_lines[:80]))
 # ============================================================
 # 2) 本文 segments 構築 & 検証
 # ============================================================
-segments = build_segments(pages_text)
-
-df_overview = pd.DataFrame(
-    [
-        {
-            "pdf_page": s["pdf_page"],
-            "page_label": s["page_label"],
-            "char_count": len(s["body"]),
-            "matched_line": (
-                s["matched_line"][:120].replace("\n", " ")
-                if isinstance(s["matched_line"], str)
-                else "-"
-            ),
-        }
+segments, rows_check, valid_segments, seg_index = _build_and_validate_segments(pdf_bytes)
+
+# 行ごとの dict を作らず，列ごとのリストから DataFrame を作る
+df_overview = pd.DataFrame({
+    "pdf_page": [s["pdf_page"] for s in segments],
+    "page_label": [s["page_label"] for s in segments],
+    "char_count": [len(s["body"]) for s in segments],
+    "matched_line": [
+        (
+            s["matched_line"][:120].replace("\n", " ")
+            if isinstance(s["matched_line"], str)
+            else "-"
+        )
         for s in segments
-    ]
-)
+    ],
+})
 
 st.subheader("抽出ページ（各ページの単独行ラベル）— 概観")
 st.dataframe(df_overview)
 
-rows_check, valid_segments, seg_index = validate_segments(segments)
 df_check = pd.DataFrame(rows_check)
 
 st.subheader("📑 ページラベル検証（連番/章番号/シリーズ）")
@@ -245,15 +341,16 @@ st.dataframe(df_check)
 # valid のみ TXT 保存
 # ============================================================
 if valid_segments:
-    txt_buf = io.StringIO()
+    # 頁ごとに UTF-8 へ変換して書き込む（全文の str とその bytes を両方持たない）
+    txt_buf = io.BytesIO()
     for s in valid_segments:
         header = f"==== pdf_page={s['pdf_page']} page_label={s['page_label']} (chars={len(s['body'])}) ====\n"
-        txt_buf.write(header)
-        txt_buf.write(s["body"].rstrip("\n") + "\n\n")
+        txt_buf.write(header.encode("utf-8"))
+        txt_buf.write((s["body"].rstrip("\n") + "\n\n").encode("utf-8"))
 
     st.download_button(
         "📥 抽出ページTXTをダウンロード（valid=True のみ）",
-        data=txt_buf.getvalue().encode("utf-8"),
+        data=txt_buf.getvalue(),
         file_name="extracted_pages_valid.txt",
         mime="text/plain",
     )
@@ -261,11 +358,10 @@ if valid_segments:
 # ============================================================
 # 3) 照合（行ベース）
 # ============================================================
-rows = check_toc_by_order(
-    toc_lines=toc_lines,
-    seg_index=seg_index,
-    pages_text=pages_text,
-    search_all_pages=search_all_pages,  # ← ユーザー操作で切替
+rows = _check_toc_rows(
+    pdf_bytes,
+    toc_join_front,
+    search_all_pages,  # ← ユーザー操作で切替
 )
 
 df_result = pd.DataFrame(rows)
@@ -279,37 +375,11 @@ st.markdown(f"**結果概要**: {summary}")
 # ============================================================
 # Excel 出力（列幅/文字列セル設定）
 # ============================================================
-xlsx_buf = io.BytesIO()
-with pd.ExcelWriter(xlsx_buf, engine="xlsxwriter") as writer:
-    sheet = "result"
-    df_result.to_excel(writer, index=False, sheet_name=sheet)
-
-    wb = writer.book
-    ws = writer.sheets[sheet]
-
-    text_fmt = wb.add_format({"num_format": "@"})
-    header_fmt = wb.add_format({"bold": True})
-    wrap_fmt = wb.add_format({"text_wrap": True})
-
-    cols = list(df_result.columns)
-    col_idx = {n: i for i, n in enumerate(cols)}
-
-    for name in ["目次頁ラベル", "pdf頁ラベル"]:
-        if name in col_idx:
-            ws.set_column(col_idx[name], col_idx[name], 16, text_fmt)
-
-    if "一致テキスト行" in col_idx:
-        ws.set_column(col_idx["一致テキスト行"], col_idx["一致テキスト行"], 40, wrap_fmt)
-
-    widths = {"タイトル": 28, "pdf頁": 10, "判定": 12}
-    for name, w in widths.items():
-        if name in col_idx:
-            ws.set_column(col_idx[name], col_idx[name], w)
-
-    for j, name in enumerate(cols):
-        ws.write(0, j, name, header_fmt)
-
-    ws.freeze_panes(1, 0)
+xlsx_bytes = _build_result_xlsx(
+    pdf_bytes,
+    toc_join_front,
+    search_all_pages,
+)
 
 base = input_result.file_name.rsplit(".", 1)[0]
 xlsx_filename = f"目次チェック_{base}.xlsx"
@@ -324,7 +394,7 @@ st.session_state[SS_TOC_OVERVIEW] = df_overview
 st.session_state[SS_TOC_CHECK] = df_check
 st.session_state[SS_TOC_RESULT] = df_result
 st.session_state[SS_TOC_SUMMARY] = summary
-st.session_state[SS_TOC_XLSX_BYTES] = xlsx_buf.getvalue()
+st.session_state[SS_TOC_XLSX_BYTES] = xlsx_bytes
 st.session_state[SS_TOC_XLSX_FILENAME] = xlsx_filename
 
 
@@ -21,10 +21,9 @@ from __future__ import annotations
 # ============================================================
 import io
 import sys
-import tempfile
 from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Tuple
 from collections import defaultdict
 
 # ============================================================
@@ -83,20 +82,19 @@ from lib.chart_check.helpers import (
     index_pages_by_key,
     ref_aggregate_for_view,
     caption_info_first_by_key,
-    aggregate_ref_info,
     make_crosscheck_rows,
     protect_for_excel_csv,
     protect_for_excel_xlsx,
     is_continuation_group,
     series_and_index,
-    first_caption_row,
 )
 
 from lib.chart_check.summary_export import build_summary_xlsx_bytes
 
 from lib.chart_check.ai_summary import (
-    build_ai_summary_xlsx_bytes,
-    build_ai_summary_jsonl_bytes,
+    build_ai_summary_frames,
+    ai_summary_frames_to_xlsx_bytes,
+    ai_summary_frames_to_jsonl_bytes,
 )
 
 from lib.chart_check.job_store import save_ai_summary_jsonl_job
@@ -244,6 +242,92 @@ def _render_saved_result_downloads_main() -> None:
         )
 
 
+# ============================================================
+# helper：PDF → ページ別テキスト（同一PDFの再実行はキャッシュ）
+# ============================================================
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # ------------------------------------------------------------
+    # PDF bytes をキーにキャッシュし，同じファイルの再実行では
+    # PyMuPDF によるページ解析を省略する
+    # ------------------------------------------------------------
+    return pdf_to_text_per_page(pdf_bytes)
+
+
+# ============================================================
+# helper：全ページ走査（同一PDF・同一設定の再実行はキャッシュ）
+# ============================================================
+@st.cache_data(show_spinner=False, max_entries=8)
+def _scan_pdf_pages(
+    pdf_bytes: bytes,
+    ctx_chars: int,
+) -> Tuple[List[str], pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    # ------------------------------------------------------------
+    # 頁ラベル + 図表（見出し/参照）抽出は PDF bytes と ctx_chars だけで
+    # 決まるため，まとめてキャッシュして再実行時の全ページ走査を省略する
+    #
+    # 図表キーごとの最初の見出し（表示用）も走査中に記録する
+    # （ページは pdf_page 昇順に走査するため，最初に出た行が先頭行）
+    # ------------------------------------------------------------
+    pages_text = _pdf_to_pages_text(pdf_bytes)
+
+    # ------------------------------------------------------------
+    # 行 dict を積まず，列ごとの list に直接追加して DataFrame 化する
+    # ------------------------------------------------------------
+    page_labels: List[str | None] = []
+    col_matched: List[str] = []
+
+    for ptxt in pages_text:
+        label, matched = extract_single_page_label(ptxt)
+        page_labels.append(label)
+        col_matched.append(matched or "-")
+
+    df_per_page_labels = pd.DataFrame(
+        {
+            "pdf_page": list(range(1, len(pages_text) + 1)),
+            "page_label": [label or "-" for label in page_labels],
+            "matched_line": col_matched,
+            "has_label": [label is not None for label in page_labels],
+        }
+    ) if pages_text else pd.DataFrame()
+
+    caption_cols: Dict[str, List[Any]] = {}
+    ref_cols: Dict[str, List[Any]] = {}
+    caption_first: Dict[str, Dict[str, Any]] = {}
+
+    def _append_hits(cols: Dict[str, List[Any]], pdf_page: int, page_label: str, hits: List[Dict[str, Any]]) -> None:
+        for h in hits:
+            cols.setdefault("pdf_page", []).append(pdf_page)
+            cols.setdefault("page_label", []).append(page_label)
+            for k, v in h.items():
+                cols.setdefault(k, []).append(v)
+
+    for i, ptxt in enumerate(pages_text, start=1):
+        page_label = page_labels[i - 1] or "-"
+        captions, refs = judge_hits_in_page(ptxt, ctx=ctx_chars)
+
+        _append_hits(caption_cols, i, page_label, captions)
+        _append_hits(ref_cols, i, page_label, refs)
+
+        for h in captions:
+            caption_first.setdefault(
+                h["図表キー"],
+                {
+                    "図表タイトル": h["見出しタイトル"] or "",
+                    "頁": page_label,
+                    "pdf頁": i,
+                },
+            )
+
+    return (
+        pages_text,
+        df_per_page_labels,
+        pd.DataFrame(caption_cols),
+        pd.DataFrame(ref_cols),
+        caption_first,
+    )
+
+
 # 🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩🟩
 # ============================================================
 # サイドバー
@@ -396,61 +480,15 @@ if pdf_kind == "image":
     st.stop()
 
 # ============================================================
-# PDF → ページ別テキスト
+# PDF → ページ別テキスト + 全ページ走査：頁ラベル + 図表（見出し/参照）抽出
 # ============================================================
-with tempfile.TemporaryDirectory() as td:
-    pdf_path = Path(td) / "input.pdf"
-    pdf_path.write_bytes(input_result.data_bytes)
-    pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+pages_text, df_per_page_labels, df_captions, df_refs, caption_first = _scan_pdf_pages(
+    pdf_bytes,
+    int(ctx_chars),
+)
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
-# ============================================================
-# 全ページ走査：頁ラベル + 図表（見出し/参照）抽出
-# ============================================================
-page_labels, per_page_rows = [], []
-
-for i, ptxt in enumerate(pages_text, start=1):
-    label, matched = extract_single_page_label(ptxt)
-    page_labels.append(label)
-    per_page_rows.append(
-        {
-            "pdf_page": i,
-            "page_label": label or "-",
-            "matched_line": matched or "-",
-            "has_label": label is not None,
-        }
-    )
-
-df_per_page_labels = pd.DataFrame(per_page_rows)
-
-caption_rows, ref_rows = [], []
-
-for i, ptxt in enumerate(pages_text, start=1):
-    page_label = page_labels[i - 1] if (i - 1) < len(page_labels) and page_labels[i - 1] else "-"
-    captions, refs = judge_hits_in_page(ptxt, ctx=ctx_chars)
-
-    for h in captions:
-        caption_rows.append(
-            {
-                "pdf_page": i,
-                "page_label": page_label,
-                **h,
-            }
-        )
-
-    for r in refs:
-        ref_rows.append(
-            {
-                "pdf_page": i,
-                "page_label": page_label,
-                **r,
-            }
-        )
-
-df_captions = pd.DataFrame(caption_rows)
-df_refs = pd.DataFrame(ref_rows)
-
 # ============================================================
 # 表示：ページラベル / 図表見出し
 # ============================================================
@@ -482,19 +520,20 @@ else:
 
         g2 = g.sort_values("pdf_page")
 
+        # ------------------------------------------------------------
+        # 一覧文字列は列単位（astype + str.cat）でまとめて作る
+        # ------------------------------------------------------------
+        titles_str = g2["見出しタイトル"].fillna("").astype(str).str.cat(sep=" | ")
+        pdf_pages_str = g2["pdf_page"].dropna().astype(int).astype(str).str.cat(sep=",")
+        labels_str = g2["page_label"].fillna("").astype(str).str.cat(sep=",")
+
         if is_continuation_group(g2):
             cont_rows.append(
                 {
                     "図表キー": k,
-                    "図表タイトル": " | ".join(
-                        [str(x) for x in g2["見出しタイトル"].fillna("").tolist()]
-                    ),
-                    "pdf頁一覧": ",".join(
-                        [str(int(x)) for x in g2["pdf_page"].dropna().astype(int).tolist()]
-                    ),
-                    "頁ラベル一覧": ",".join(
-                        [str(x) for x in g2["page_label"].fillna("").tolist()]
-                    ),
+                    "図表タイトル": titles_str,
+                    "pdf頁一覧": pdf_pages_str,
+                    "頁ラベル一覧": labels_str,
                     "備考": "（続きのページとみなす）",
                 }
             )
@@ -502,15 +541,9 @@ else:
             dup_rows.append(
                 {
                     "図表キー": k,
-                    "見出しタイトル一覧": " | ".join(
-                        [str(x) for x in g2["見出しタイトル"].fillna("").tolist()]
-                    ),
-                    "pdf頁一覧": ",".join(
-                        [str(int(x)) for x in g2["pdf_page"].dropna().astype(int).tolist()]
-                    ),
-                    "頁ラベル一覧": ",".join(
-                        [str(x) for x in g2["page_label"].fillna("").tolist()]
-                    ),
+                    "見出しタイトル一覧": titles_str,
+                    "pdf頁一覧": pdf_pages_str,
+                    "頁ラベル一覧": labels_str,
                     "備考": "（真の重複の可能性）",
                 }
             )
@@ -533,9 +566,11 @@ else:
     # ------------------------------------------------------------
     series_map = defaultdict(list)
 
-    for _, r in df_captions.iterrows():
-        key = str(r.get("図表キー"))
-        pdfp = r.get("pdf_page")
+    for key_raw, pdfp in zip(
+        df_captions["図表キー"].tolist(),
+        df_captions["pdf_page"].tolist(),
+    ):
+        key = str(key_raw)
         series, idx, kind = series_and_index(key)
 
         if idx is None:
@@ -688,7 +723,14 @@ referenced_keys = sorted(
 rows_view = []
 
 for k in referenced_keys:
-    ci = first_caption_row(df_captions, k)
+    ci = caption_first.get(
+        k,
+        {
+            "図表タイトル": "",
+            "頁": "",
+            "pdf頁": 10**9,
+        },
+    )
     bk = base_key(k)
 
     rows_view.append(
@@ -768,12 +810,8 @@ cap_info = caption_info_first_by_key(
     df_per_page_labels,
 )
 
-ref_page_labels, ref_pdf_pages, ref_texts2, ref_highlight_texts = aggregate_ref_info(
-    df_refs,
-    base_key_func=base_key,
-)
-
-ref_base_keys_x = set(ref_page_labels.keys())
+# 参照側の集約は表示用（ref_aggregate_for_view）と同一結果のため再計算しない
+ref_base_keys_x = ref_base_keys_view
 
 referenced_keys_x = sorted(
     k
@@ -785,10 +823,10 @@ df_referenced_captions_x = make_crosscheck_rows(
     referenced_keys_x,
     caption_src=True,
     cap_info=cap_info,
-    ref_page_labels=ref_page_labels,
-    ref_pdf_pages=ref_pdf_pages,
-    ref_texts=ref_texts2,
-    ref_highlight_texts=ref_highlight_texts,
+    ref_page_labels=ref_lbls,
+    ref_pdf_pages=ref_pdfs,
+    ref_texts=ref_texts,
+    ref_highlight_texts=ref_hi,
     base_key_func=base_key,
 )
 
@@ -796,10 +834,10 @@ df_missing_caption_refs_x = make_crosscheck_rows(
     sorted(missing_in_refs),
     caption_src=True,
     cap_info=cap_info,
-    ref_page_labels=ref_page_labels,
-    ref_pdf_pages=ref_pdf_pages,
-    ref_texts=ref_texts2,
-    ref_highlight_texts=ref_highlight_texts,
+    ref_page_labels=ref_lbls,
+    ref_pdf_pages=ref_pdfs,
+    ref_texts=ref_texts,
+    ref_highlight_texts=ref_hi,
     base_key_func=base_key,
 )
 
@@ -807,10 +845,10 @@ df_orphan_refs_x = make_crosscheck_rows(
     sorted(missing_in_captions),
     caption_src=False,
     cap_info=cap_info,
-    ref_page_labels=ref_page_labels,
-    ref_pdf_pages=ref_pdf_pages,
-    ref_texts=ref_texts2,
-    ref_highlight_texts=ref_highlight_texts,
+    ref_page_labels=ref_lbls,
+    ref_pdf_pages=ref_pdfs,
+    ref_texts=ref_texts,
+    ref_highlight_texts=ref_hi,
     base_key_func=base_key,
 )
 
@@ -897,8 +935,9 @@ _summary_xlsx_bytes = build_summary_xlsx_bytes(
 
 # ============================================================
 # AI用サマリー bytes 生成
+# （前後テキスト抽出は1回だけ行い，xlsx / jsonl で共有する）
 # ============================================================
-_ai_summary_xlsx_bytes = build_ai_summary_xlsx_bytes(
+_ai_summary_frames = build_ai_summary_frames(
     df_captions=df_captions,
     df_refs=df_refs,
     pages_text=pages_text,
@@ -906,13 +945,8 @@ _ai_summary_xlsx_bytes = build_ai_summary_xlsx_bytes(
     next_text_max_chars=int(ai_next_text_max_chars),
 )
 
-_ai_summary_jsonl_bytes = build_ai_summary_jsonl_bytes(
-    df_captions=df_captions,
-    df_refs=df_refs,
-    pages_text=pages_text,
-    prev_text_max_chars=int(ai_prev_text_max_chars),
-    next_text_max_chars=int(ai_next_text_max_chars),
-)
+_ai_summary_xlsx_bytes = ai_summary_frames_to_xlsx_bytes(_ai_summary_frames)
+_ai_summary_jsonl_bytes = ai_summary_frames_to_jsonl_bytes(_ai_summary_frames)
 
 # ============================================================
 # AI用サマリーJSONLを内部保存
@@ -965,13 +999,13 @@ for df, name in [
         if "page_label" in df2.columns:
             df2["page_label"] = df2["page_label"].map(protect_for_excel_csv)
 
-        buf = io.StringIO()
-        df2.to_csv(buf, index=False)
+        buf = io.BytesIO()
+        df2.to_csv(buf, index=False, encoding="utf-8-sig")
 
         csv_items.append(
             {
                 "label": f"📥 {name}",
-                "data": buf.getvalue().encode("utf-8-sig"),
+                "data": buf.getvalue(),
                 "file_name": name,
             }
         )
@@ -800,8 +800,8 @@ if isinstance(df_result_saved, pd.DataFrame) and not df_result_saved.empty:
 
     base = Path(source_file_saved or "input").stem
 
-    csv_buf = io.StringIO()
-    df_result_saved.to_csv(csv_buf, index=False)
+    csv_buf = io.BytesIO()
+    df_result_saved.to_csv(csv_buf, index=False, encoding="utf-8-sig")
 
     result_json_text = json.dumps(
         st.session_state.get("ai_ref_result_objects") or [],
@@ -842,8 +842,8 @@ if isinstance(df_result_saved, pd.DataFrame) and not df_result_saved.empty:
 
     base = Path(source_file_saved or "input").stem
 
-    csv_buf = io.StringIO()
-    df_result_saved.to_csv(csv_buf, index=False)
+    csv_buf = io.BytesIO()
+    df_result_saved.to_csv(csv_buf, index=False, encoding="utf-8-sig")
 
     result_json_text = json.dumps(
         st.session_state.get("ai_ref_result_objects") or [],
@@ -869,7 +869,7 @@ if isinstance(df_result_saved, pd.DataFrame) and not df_result_saved.empty:
 
         st.download_button(
             "📄 AI図表チェック結果（csv）",
-            data=csv_buf.getvalue().encode("utf-8-sig"),
+            data=csv_buf.getvalue(),
             file_name=f"AI図表チェック_{base}.csv",
             mime="text/csv",
         )
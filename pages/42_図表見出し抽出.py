@@ -5,11 +5,9 @@
 # Excel (xlsx) でダウンロードできるページ。
 
 from __future__ import annotations
-from pathlib import Path
 from typing import List, Dict, Any, Tuple
 import io
 import re
-import tempfile
 
 import streamlit as st
 import pandas as pd
@@ -55,12 +53,15 @@ if not uploaded or not run:
     st.stop()
 
 # =========================
-# PDF → ページ別テキスト
+# PDF → ページ別テキスト（同一PDFの再実行はキャッシュ）
 # =========================
-with tempfile.TemporaryDirectory() as td:
-    pdf_path = Path(td) / "input.pdf"
-    pdf_path.write_bytes(uploaded.getvalue())
-    pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # オプションを変えて再実行するときは PDF 解析を省略する
+    return pdf_to_text_per_page(pdf_bytes)
+
+
+pages_text: List[str] = _pdf_to_pages_text(uploaded.getvalue())
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
@@ -87,6 +88,27 @@ EXTRACT_RE = re.compile(
 )
 
 
+# 全角数字・全角括弧 → 半角，ドット類 → "."，ハイフン類 → "-" を 1 回の translate で行う
+# （DOT / HY の各文字と同じ集合）
+_CANON_NUM_TABLE = str.maketrans(
+    "０１２３４５６７８９（）"
+    "．・･"
+    "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\uFF0D\u30FC",
+    "0123456789()"
+    "..."
+    "---------",
+)
+
+# canon_num の空白調整（呼び出しごとにパターンを引かない）
+_DOT_SPACES_RE = re.compile(r"\s*\.\s*")
+_HY_SPACES_RE = re.compile(r"\s*-\s*")
+_MULTI_SPACES_RE = re.compile(r"[ \u3000]+")
+_PAREN_OPEN_SPACES_RE = re.compile(r"\(\s*")
+_PAREN_CLOSE_SPACES_RE = re.compile(r"\s*\)")
+
+# 図表番号の直後に続く区切り記号（タイトル文字列の先頭から除く）
+CAPTION_LEAD_RE = re.compile(r"^[\s:：.\-．、・]+")
+
 def canon_num(num: str) -> str:
     """
     図表番号の正規化：
@@ -95,25 +117,19 @@ def canon_num(num: str) -> str:
     - ハイフン類を "-"
     - 括弧内の余計な空白削除
     """
-    # 全角 → 半角
-    s = num.translate(str.maketrans("０１２３４５６７８９（）", "0123456789()"))
-
-    # ドット類 → "."
-    s = re.sub(DOT, ".", s)
-
-    # ハイフン類 → "-"
-    s = re.sub(HY, "-", s)
+    # 全角 → 半角，ドット類 → "."，ハイフン類 → "-"
+    s = num.translate(_CANON_NUM_TABLE)
 
     # "." と "-" の前後スペース削除
-    s = re.sub(r"\s*\.\s*", ".", s)
-    s = re.sub(r"\s*-\s*", "-", s)
+    s = _DOT_SPACES_RE.sub(".", s)
+    s = _HY_SPACES_RE.sub("-", s)
 
     # 複数スペース → 1 個
-    s = re.sub(r"[ \u3000]+", " ", s)
+    s = _MULTI_SPACES_RE.sub(" ", s)
 
     # 括弧内スペース削除
-    s = re.sub(r"\(\s*", "(", s)
-    s = re.sub(r"\s*\)", ")", s)
+    s = _PAREN_OPEN_SPACES_RE.sub("(", s)
+    s = _PAREN_CLOSE_SPACES_RE.sub(")", s)
 
     return s.strip()
 
@@ -133,6 +149,9 @@ except Exception:
 
 PARTICLES_RE = re2.compile(r"(?:に|を|は|へ|で|と|の|など|等|または|又は|および|及び|かつ)")
 
+# 「図表番号の直後（空白可）に助詞・接続語が続くか」の判定用（マッチごとに組み立てない）
+PARTICLE_FOLLOW_RE = re2.compile(rf"\s*{PARTICLES_RE.pattern}")
+
 
 # ===== 行抽出補助関数 =====
 def extract_line_covering_match(full: str, start: int, end: int) -> Tuple[int, str, int, int]:
@@ -163,6 +182,11 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
     """
     captions: List[Dict[str, Any]] = []
     refs: List[Dict[str, Any]] = []
+
+    # 「図」「表」を含まないページは正規表現を走らせない（安価な事前判定）
+    if "図" not in page_text and "表" not in page_text:
+        return captions, refs
+
     full = page_text.replace("\r\n", "\n").replace("\r", "\n")
 
     for m in EXTRACT_RE.finditer(full):
@@ -172,15 +196,16 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         is_line_head = (full[line_start:m.start()].strip() == "")
         rel_end = (m.start() - line_start) + len(raw)
         after_on_line = line_txt[rel_end:] if rel_end <= len(line_txt) else ""
-        particle_follow = bool(re2.match(rf"\s*{PARTICLES_RE.pattern}", after_on_line))
+        particle_follow = bool(PARTICLE_FOLLOW_RE.match(after_on_line))
         has_period = ("。" in line_txt)
         is_reference = (not is_line_head) or particle_follow or has_period
 
         # 強調と excerpt
-        highlighted = line_txt.replace(raw, f"⟪{raw}⟫", 1)
-        left  = max(0, m.start() - ctx)
-        right = min(len(full), m.end() + ctx)
-        excerpt = full[left:m.start()] + f"⟪{raw}⟫" + full[m.end():right]
+        marked = f"⟪{raw}⟫"
+        highlighted = line_txt.replace(raw, marked, 1)
+        m_start, m_end = m.span()
+        left  = max(0, m_start - ctx)
+        excerpt = f"{full[left:m_start]}{marked}{full[m_end:m_end + ctx]}"
 
         if is_reference:
             refs.append({
@@ -200,7 +225,7 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
             })
         else:
             # 行頭に「図3.1-1 ...」などが来ている場合 → 見出しとみなす
-            title = re.sub(r"^[\s:：.\-．、・]+", "", after_on_line).strip()
+            title = CAPTION_LEAD_RE.sub("", after_on_line).strip()
             captions.append({
                 "行番号": lineno,
                 "図表種類": kind,
@@ -219,29 +244,35 @@ def judge_hits_in_page(page_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
 # =========================
 # 全ページ走査（頁ラベル＋図表見出し）
 # =========================
+# 行 dict を積まず，列ごとの list に直接追加して DataFrame 化する
 page_labels: List[str] = []
-per_page_rows: List[Dict[str, Any]] = []
+col_matched: List[str] = []
 
-for i, ptxt in enumerate(pages_text, start=1):
+for ptxt in pages_text:
     label, matched = extract_single_page_label(ptxt)
     page_labels.append(label)
-    per_page_rows.append({
-        "pdf_page": i,
-        "page_label": label or "-",
-        "matched_line": matched or "-",
-        "has_label": label is not None,
-    })
-
-df_per_page_labels = pd.DataFrame(per_page_rows)
-
-caption_rows: List[Dict[str, Any]] = []
+    col_matched.append(matched or "-")
+
+df_per_page_labels = pd.DataFrame(
+    {
+        "pdf_page": list(range(1, len(pages_text) + 1)),
+        "page_label": [label or "-" for label in page_labels],
+        "matched_line": col_matched,
+        "has_label": [label is not None for label in page_labels],
+    }
+) if pages_text else pd.DataFrame()
+
+caption_cols: Dict[str, List[Any]] = {}
 for i, ptxt in enumerate(pages_text, start=1):
-    page_label = page_labels[i - 1] if i - 1 < len(page_labels) and page_labels[i - 1] else "-"
+    page_label = page_labels[i - 1] or "-"
     captions, _ = judge_hits_in_page(ptxt, ctx=ctx_chars)
     for h in captions:
-        caption_rows.append({"pdf_page": i, "page_label": page_label, **h})
+        caption_cols.setdefault("pdf_page", []).append(i)
+        caption_cols.setdefault("page_label", []).append(page_label)
+        for k, v in h.items():
+            caption_cols.setdefault(k, []).append(v)
 
-df_captions = pd.DataFrame(caption_rows)
+df_captions = pd.DataFrame(caption_cols)
 
 # =========================
 # 表示
@@ -282,11 +313,11 @@ with st.sidebar:
 
     # --- CSV（おまけ） ---
     if not df_captions.empty:
-        buf_csv = io.StringIO()
-        df_captions.to_csv(buf_csv, index=False)
+        buf_csv = io.BytesIO()
+        df_captions.to_csv(buf_csv, index=False, encoding="utf-8-sig")
         st.download_button(
             "📄 図表見出し（CSV）をダウンロード",
-            data=buf_csv.getvalue().encode("utf-8-sig"),
+            data=buf_csv.getvalue(),
             file_name="figure_table_captions.csv",
             mime="text/csv",
             use_container_width=True,
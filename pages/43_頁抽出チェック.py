@@ -12,9 +12,7 @@
 
 from __future__ import annotations
 import io
-import tempfile
-from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional
 
 import streamlit as st
 import pandas as pd
@@ -25,7 +23,7 @@ import pandas as pd
 from lib.toc_check.toc_segments import (
     pdf_to_text_per_page,
     extract_single_page_label,
-    valid_and_reason_auto,
+    check_label_sequence,
 )
 
 # =========================
@@ -51,15 +49,15 @@ if not uploaded or not run:
     st.stop()
 
 # =========================
-# PDF → ページ別テキスト
+# PDF → ページ別テキスト（同一PDFの再実行はキャッシュ）
 # =========================
-with tempfile.TemporaryDirectory() as td:
-    td = Path(td)
-    pdf_path = td / "input.pdf"
-    pdf_path.write_bytes(uploaded.getvalue())
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # サイドバー操作などによる再実行では PDF 解析を省略する
+    return pdf_to_text_per_page(pdf_bytes)
 
-    # ★ ここが toc_segments 版
-    pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+
+pages_text: List[str] = _pdf_to_pages_text(uploaded.getvalue())
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
@@ -67,22 +65,22 @@ st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 # =========================
 # 1頁 = 高々1ページラベル抽出
 # =========================
-rows_page: List[Dict[str, Any]] = []
+# 行ごとの dict ではなく列ごとのリストに積み，そのまま DataFrame にする
 page_labels: List[Optional[str]] = []
+matched_lines: List[str] = []
 
-for i, ptxt in enumerate(pages_text, start=1):
+for ptxt in pages_text:
     label, matched = extract_single_page_label(ptxt)
 
     page_labels.append(label)
-
-    rows_page.append({
-        "pdf_page": i,
-        "page_label": label if label is not None else "-",
-        "matched_line": matched if matched is not None else "-",
-        "has_label": label is not None,
-    })
-
-df_per_page = pd.DataFrame(rows_page)
+    matched_lines.append(matched if matched is not None else "-")
+
+df_per_page = pd.DataFrame({
+    "pdf_page": range(1, len(page_labels) + 1),
+    "page_label": [label if label is not None else "-" for label in page_labels],
+    "matched_line": matched_lines,
+    "has_label": [label is not None for label in page_labels],
+})
 st.subheader("🔎 各ページの頁ラベル（1頁=高々1）")
 st.dataframe(df_per_page, use_container_width=True)
 
@@ -92,22 +90,16 @@ st.dataframe(df_per_page, use_container_width=True)
 # =========================
 found_labels = [lab for lab in page_labels if lab]
 
-rows_seq: List[Dict[str, Any]] = []
-prev_ok: Optional[str] = None
-
-for idx, lab in enumerate(found_labels, start=1):
-    ok, reason = valid_and_reason_auto(lab, prev_ok)
-    if ok:
-        prev_ok = lab
-
-    rows_seq.append({
-        "order_in_found": idx,
-        "label": lab,
-        "valid": ok,
-        "reason": "" if ok else reason
-    })
+seq_checks = check_label_sequence(found_labels)
+seq_valid: List[bool] = [ok for ok, _reason in seq_checks]
+seq_reason: List[str] = [reason for _ok, reason in seq_checks]
 
-df_seq = pd.DataFrame(rows_seq)
+df_seq = pd.DataFrame({
+    "order_in_found": range(1, len(found_labels) + 1),
+    "label": found_labels,
+    "valid": seq_valid,
+    "reason": seq_reason,
+})
 st.subheader("✅ 見つかった頁ラベル列の連番チェック")
 st.dataframe(df_seq if not df_seq.empty else pd.DataFrame(), use_container_width=True)
 
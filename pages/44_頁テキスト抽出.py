@@ -9,8 +9,6 @@
 
 from __future__ import annotations
 import io
-import tempfile
-from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 
 import streamlit as st
@@ -20,7 +18,7 @@ import pandas as pd
 from lib.toc_check.toc_segments import (
     pdf_to_text_per_page,
     extract_single_page_label,
-    valid_and_reason_auto,
+    check_label_sequence,
 )
 from lib.text_normalizer import normalize_strict
 
@@ -87,7 +85,7 @@ PDF 抽出後の `pages_text[i]` は以下の標準化を受けます．
 
 ---
 
-### 🔁 3. `valid_and_reason_auto` による連番チェック
+### 🔁 3. `check_label_sequence` による連番チェック
 
 抽出されたラベルが自然な連番になっているかを検査します．  
 問題なければ `valid=True`，番号飛び・形式不一致があると `valid=False` になります．
@@ -146,13 +144,15 @@ if fitz is None and pdfplumber is None:
 
 
 # =========================
-# PDF → ページ別テキスト
+# PDF → ページ別テキスト（同一PDFの再実行はキャッシュ）
 # =========================
-with tempfile.TemporaryDirectory() as td:
-    td_path = Path(td)
-    pdf_path = td_path / "input.pdf"
-    pdf_path.write_bytes(uploaded.getvalue())
-    pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # サイドバー操作などによる再実行では PDF 解析を省略する
+    return pdf_to_text_per_page(pdf_bytes)
+
+
+pages_text: List[str] = _pdf_to_pages_text(uploaded.getvalue())
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
@@ -177,24 +177,13 @@ for i, ptxt in enumerate(pages_text, start=1):
 
 
 # =========================
-# 連番チェック（toc_segments.valid_and_reason_auto を使用）
+# 連番チェック（toc_segments.check_label_sequence を使用）
 # =========================
-prev_ok: Optional[str] = None
-valid_flags: Dict[int, bool] = {}
-
-for s in segments:
-    lab = s["page_label"]
-    pdf_page = s["pdf_page"]
-
-    if lab is None:
-        # ラベルが無いページは valid=False（ただし後で必ず出力対象にする）
-        valid_flags[pdf_page] = False
-        continue
-
-    ok, _reason = valid_and_reason_auto(lab, prev_ok)
-    if ok:
-        prev_ok = lab
-    valid_flags[pdf_page] = ok
+# segments と同じ並びの bool 列（pdf_page をキーにした辞書引きはしない）
+# ラベルが無いページは valid=False（ただし後で必ず出力対象にする）
+valid_flags: List[bool] = [
+    ok for ok, _reason in check_label_sequence([s["page_label"] for s in segments])
+]
 
 
 # =========================
@@ -203,11 +192,12 @@ for s in segments:
 #  - ラベル無し（page_label is None）のページ → 出力（headerは page_label=None）
 #  - ラベル有り & valid=False のページ → 出力しない
 # =========================
-txt_buf = io.StringIO()
+# 頁ごとに UTF-8 へ変換して書き込む（全文の str とその bytes を両方持たない）
+txt_buf = io.BytesIO()
 num_valid = 0
 num_none = 0
 
-for s in segments:
+for s, is_valid in zip(segments, valid_flags):
     label = s["page_label"]
     pdf_page = s["pdf_page"]
     include = False
@@ -219,7 +209,7 @@ for s in segments:
         num_none += 1
     else:
         # ラベルありで valid=True のページだけ出力
-        if valid_flags.get(pdf_page, False):
+        if is_valid:
             include = True
             label_str = str(label)
             num_valid += 1
@@ -232,8 +222,8 @@ for s in segments:
             f"pdf頁ラベル（page_label）={label_str} "
             f"(chars={len(s['body'])}) ====\n"
         )
-        txt_buf.write(header)
-        txt_buf.write(s["body"].rstrip("\n") + "\n\n")
+        txt_buf.write(header.encode("utf-8"))
+        txt_buf.write((s["body"].rstrip("\n") + "\n\n").encode("utf-8"))
 
 
 # =========================
@@ -245,7 +235,7 @@ if num_valid > 0 or num_none > 0:
 
     st.download_button(
         "📥 抽出したテキスト（txt）をダウンロード",
-        data=txt_buf.getvalue().encode("utf-8"),
+        data=txt_buf.getvalue(),
         file_name=out_name,
         mime="text/plain",
         use_container_width=True,
@@ -258,12 +258,13 @@ def make_excel(
 
     with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
         workbook = writer.book
+        # 文字列書式は 3 シートで共通なので 1 回だけ作る
+        text_fmt = workbook.add_format({"num_format": "@"})
 
         if df_styles is not None and not df_styles.empty:
             sheet_name = "styles"
             df_styles.to_excel(writer, index=False, sheet_name=sheet_name)
             ws = writer.sheets[sheet_name]
-            text_fmt = workbook.add_format({"num_format": "@"})
 
             # 文字列扱いにしたい列をまとめて指定
             col_indices = {name: i for i, name in enumerate(df_styles.columns)}
@@ -276,7 +277,6 @@ def make_excel(
             sheet_name = "abstractNumLevels"
             df_abs.to_excel(writer, index=False, sheet_name=sheet_name)
             ws = writer.sheets[sheet_name]
-            text_fmt = workbook.add_format({"num_format": "@"})
             col_indices = {name: i for i, name in enumerate(df_abs.columns)}
             for col_name in ["abstractNumId", "ilvl", "numFmt", "lvlText", "start"]:
                 if col_name in col_indices:
@@ -287,7 +287,6 @@ def make_excel(
             sheet_name = "numMap"
             df_map.to_excel(writer, index=False, sheet_name=sheet_name)
             ws = writer.sheets[sheet_name]
-            text_fmt = workbook.add_format({"num_format": "@"})
             col_indices = {name: i for i, name in enumerate(df_map.columns)}
             for col_name in ["numId", "abstractNumId"]:
                 if col_name in col_indices:
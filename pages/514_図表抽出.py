@@ -61,16 +61,26 @@ EXTRACT_RE = re.compile(
     re.X
 )
 
+# 全角数字・全角括弧 → 半角，ドット類 → "."，ハイフン類 → "-" を 1 回の translate で行う
+# （DOT / HY の各文字と同じ集合）
+_CANON_NUM_TABLE = str.maketrans(
+    "０１２３４５６７８９（）"
+    "．・･"
+    "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\uFF0D\u30FC",
+    "0123456789()"
+    "..."
+    "---------",
+)
+
+# 図表番号の直後に続く区切り記号（タイトル文字列の先頭から除く）
+CAPTION_LEAD_RE = re.compile(r"^[\s:：.\-．、・]+")
+
 def canon_num(num: str) -> str:
     """図表番号の正規化：全角→半角、（1）→1、全角ドット→.、空白/余分な記号調整。"""
-    s = num.translate(str.maketrans("０１２３４５６７８９（）", "0123456789()"))
-    s = re.sub(DOT, ".", s)
-    s = re.sub(HY, "-", s)
-    s = re.sub(r"[()（）]", "", s)
-    s = re.sub(r"\s*\.\s*", ".", s)
-    s = re.sub(r"\s*-\s*", "-", s)
-    s = re.sub(r"\s+", "", s)
-    return s
+    # 括弧と空白はすべて除くため，"." / "-" 前後の空白詰めは不要
+    # （全角括弧は translate で半角になっている）
+    s = num.translate(_CANON_NUM_TABLE).replace("(", "").replace(")", "")
+    return "".join(s.split())
 
 def canon_label(kind: str, num: str) -> str:
     return f"{kind}{canon_num(num)}"
@@ -83,6 +93,9 @@ except Exception:
 
 PARTICLES_RE = re2.compile(r"(?:に|を|は|へ|で|と|の|など|等|または|又は|および|及び|かつ)")
 
+# 「図表番号の直後（空白可）に助詞・接続語が続くか」の判定用（マッチごとに組み立てない）
+PARTICLE_FOLLOW_RE = re2.compile(rf"\s*{PARTICLES_RE.pattern}")
+
 def extract_line_covering_match(full: str, start: int, end: int) -> Tuple[int, str, int, int]:
     """
     マッチ区間 [start, end) を必ず含む '行' を返す。
@@ -133,7 +146,7 @@ def judge_hits_in_text(full_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         after_on_line = line_txt[rel_end:] if rel_end <= len(line_txt) else ""
 
         # 直後助詞チェック（空白スキップ許容）
-        particle_follow = bool(re2.match(rf"\s*{PARTICLES_RE.pattern}", after_on_line))
+        particle_follow = bool(PARTICLE_FOLLOW_RE.match(after_on_line))
         # 句点の有無
         has_period = ("。" in line_txt)
 
@@ -142,10 +155,11 @@ def judge_hits_in_text(full_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
         # 追加の見やすさ改善：
         #  ・行テキスト内でヒット箇所を ⟪…⟫ で強調（最初の1回だけ）
         #  ・前後 ±ctx の抜粋 excerpt を付与
-        highlighted = line_txt.replace(raw, f"⟪{raw}⟫", 1)
-        left  = max(0, m.start() - ctx)
-        right = min(len(full), m.end() + ctx)
-        excerpt = full[left:m.start()] + f"⟪{raw}⟫" + full[m.end():right]
+        marked = f"⟪{raw}⟫"
+        highlighted = line_txt.replace(raw, marked, 1)
+        m_start, m_end = m.span()
+        left  = max(0, m_start - ctx)
+        excerpt = f"{full[left:m_start]}{marked}{full[m_end:m_end + ctx]}"
 
         if is_reference:
             refs.append({
@@ -168,7 +182,7 @@ def judge_hits_in_text(full_text: str, ctx: int) -> Tuple[List[Dict[str, Any]],
             })
         else:
             # タイトル：ヒット直後の行の残りをタイトルとして採取
-            title = re.sub(r"^[\s:：.\-．、・]+", "", after_on_line).strip()
+            title = CAPTION_LEAD_RE.sub("", after_on_line).strip()
             captions.append({
                 "行番号": lineno,
                 "図表種類": kind,
@@ -212,9 +226,9 @@ for df, name in [
     (df_refs,     "figure_table_references_from_text.csv"),
 ]:
     if not df.empty:
-        buf = io.StringIO(); df.to_csv(buf, index=False)
+        buf = io.BytesIO(); df.to_csv(buf, index=False, encoding="utf-8-sig")
         st.download_button(f"📥 {name}",
-                           data=buf.getvalue().encode("utf-8-sig"),
+                           data=buf.getvalue(),
                            file_name=name,
                            mime="text/csv",
                            use_container_width=True)
@@ -6,8 +6,6 @@
 #   1ページごとのテキストをページ単位で区切って表示・ダウンロードする。
 
 from __future__ import annotations
-from pathlib import Path
-import tempfile
 import io
 from typing import List
 
@@ -62,14 +60,15 @@ if fitz is None and pdfplumber is None:
     st.stop()
 
 # =========================
-# PDF → ページ別テキスト
+# PDF → ページ別テキスト（同一PDFの再実行はキャッシュ）
 # =========================
-with tempfile.TemporaryDirectory() as td:
-    td_path = Path(td)
-    pdf_path = td_path / "input.pdf"
-    pdf_path.write_bytes(uploaded.getvalue())
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # サイドバー操作などによる再実行では PDF 解析を省略する
+    return pdf_to_text_per_page(pdf_bytes)
 
-    pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+
+pages_text: List[str] = _pdf_to_pages_text(uploaded.getvalue())
 
 st.success(f"PDF 読み込み完了：ページ数 {len(pages_text)}")
 
@@ -88,18 +87,19 @@ else:
 # TXT ダウンロード（任意）
 # =========================
 if show_download and pages_text:
-    buf = io.StringIO()
+    # 頁ごとに UTF-8 へ変換して書き込む（全文の str とその bytes を両方持たない）
+    buf = io.BytesIO()
     for i, txt in enumerate(pages_text, start=1):
         header = f"==== Page {i} ====\n"
-        buf.write(header)
-        buf.write((txt or "").rstrip("\n") + "\n\n")
+        buf.write(header.encode("utf-8"))
+        buf.write(((txt or "").rstrip("\n") + "\n\n").encode("utf-8"))
 
     base = uploaded.name.rsplit(".", 1)[0]
     out_name = f"頁テキスト_{base}.txt"
 
     st.download_button(
         "📥 全ページテキスト（txt）をダウンロード",
-        data=buf.getvalue().encode("utf-8"),
+        data=buf.getvalue(),
         file_name=out_name,
         mime="text/plain",
         use_container_width=True,
@@ -33,21 +33,31 @@ EXTRACT_RE = re.compile(
     re.X
 )
 
+# 全角→半角（数字・括弧）の変換表（呼び出しごとに作らない）
+_Z2H_NUM_PAREN_TABLE = str.maketrans("０１２３４５６７８９（）", "0123456789()")
+# canon_num の置換パターン（呼び出しごとにパターンを引かない）
+_DOT_RE = re.compile(DOT)
+_HY_RE = re.compile(HY)
+_PARENS_RE = re.compile(r"[()（）]")
+_DOT_SPACES_RE = re.compile(r"\s*\.\s*")
+_HY_SPACES_RE = re.compile(r"\s*-\s*")
+_SPACES_RE = re.compile(r"\s+")
+
 def canon_num(num: str) -> str:
     """番号表記の正規化（全角→半角、ドット/ハイフンの空白除去、括弧除去）"""
     s = num
     # 全角→半角（数字・括弧）
-    s = s.translate(str.maketrans("０１２３４５６７８９（）", "0123456789()"))
+    s = s.translate(_Z2H_NUM_PAREN_TABLE)
     # ドット・ハイフン類を標準化
-    s = re.sub(DOT, ".", s)
-    s = re.sub(HY, "-", s)
+    s = _DOT_RE.sub(".", s)
+    s = _HY_RE.sub("-", s)
     # 括弧の除去（（3）→3）
-    s = re.sub(r"[()（）]", "", s)
+    s = _PARENS_RE.sub("", s)
     # 区切り前後の空白を詰める
-    s = re.sub(r"\s*\.\s*", ".", s)
-    s = re.sub(r"\s*-\s*", "-", s)
+    s = _DOT_SPACES_RE.sub(".", s)
+    s = _HY_SPACES_RE.sub("-", s)
     # 残る空白も削除
-    s = re.sub(r"\s+", "", s)
+    s = _SPACES_RE.sub("", s)
     return s
 
 def canon_label(kind: str, num: str) -> str:
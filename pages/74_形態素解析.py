@@ -114,11 +114,11 @@ if run:
     st.dataframe(df_tokens, use_container_width=True, height=320)
 
     # ダウンロード（名詞一覧）
-    buf_tok = io.StringIO()
+    buf_tok = io.BytesIO()
     df_tokens.to_csv(buf_tok, index=False, encoding="utf-8-sig")
     st.download_button(
         "📥 名詞一覧をCSVで保存",
-        data=buf_tok.getvalue().encode("utf-8-sig"),
+        data=buf_tok.getvalue(),
         file_name="nouns_list.csv",
         mime="text/csv",
         use_container_width=True,
@@ -132,11 +132,11 @@ if run:
     st.dataframe(df_freq, use_container_width=True, height=320)
 
     # ダウンロード（頻度表）
-    buf_freq = io.StringIO()
+    buf_freq = io.BytesIO()
     df_freq.to_csv(buf_freq, index=False, encoding="utf-8-sig")
     st.download_button(
         "📥 頻度表をCSVで保存",
-        data=buf_freq.getvalue().encode("utf-8-sig"),
+        data=buf_freq.getvalue(),
         file_name="nouns_freq.csv",
         mime="text/csv",
         use_container_width=True,
@@ -129,12 +129,16 @@ run = st.button("🚀 解析する")
 
 def extract_text_from_pdf(file) -> str:
     """PDF からテキスト抽出（PyMuPDF → pdfplumber の順で試す）"""
-    data = file.read()
+    return _pdf_bytes_to_text(file.getvalue())
+
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_bytes_to_text(data: bytes) -> str:
+    # 同じ PDF で「解析する」を押し直したときは PDF 解析を省略する
     if _HAS_FITZ:
         try:
-            doc = fitz.open(stream=data, filetype="pdf")
-            return "\n".join(page.get_text("text") for page in doc)
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                return "\n".join(page.get_text("text") for page in doc)
         except Exception:
             pass
 
@@ -340,11 +344,11 @@ if run:
     df_tokens = pd.DataFrame(rows_tokens, columns=["表層形", "原形", "品詞", "開始位置"])
     st.dataframe(df_tokens, use_container_width=True, height=280)
 
-    buf = io.StringIO()
+    buf = io.BytesIO()
     df_tokens.to_csv(buf, index=False, encoding="utf-8-sig")
     st.download_button(
         "📥 名詞一覧 CSV",
-        buf.getvalue().encode("utf-8-sig"),
+        buf.getvalue(),
         file_name=f"{prefix}_{base_name}__名詞一覧.csv",
         mime="text/csv",
         use_container_width=True,
@@ -364,11 +368,11 @@ if run:
         df_k = pd.DataFrame(rows_k, columns=["表層形", "原形", "品詞", "開始位置"])
         st.dataframe(df_k, use_container_width=True, height=240)
 
-        buf_k = io.StringIO()
+        buf_k = io.BytesIO()
         df_k.to_csv(buf_k, index=False, encoding="utf-8-sig")
         st.download_button(
             "📥 カタカナ語一覧 CSV",
-            buf_k.getvalue().encode("utf-8-sig"),
+            buf_k.getvalue(),
             file_name=f"{prefix}_{base_name}__カタカナ一覧.csv",
             mime="text/csv",
             use_container_width=True,
@@ -379,11 +383,11 @@ if run:
         df_kfreq = pd.DataFrame(counter_k.most_common(), columns=["カタカナ語", "頻度"])
         st.dataframe(df_kfreq, use_container_width=True, height=240)
 
-        buf_kf = io.StringIO()
+        buf_kf = io.BytesIO()
         df_kfreq.to_csv(buf_kf, index=False, encoding="utf-8-sig")
         st.download_button(
             "📥 カタカナ頻度 CSV",
-            buf_kf.getvalue().encode("utf-8-sig"),
+            buf_kf.getvalue(),
             file_name=f"{prefix}_{base_name}__カタカナ頻度.csv",
             mime="text/csv",
             use_container_width=True,
@@ -400,11 +404,11 @@ if run:
     df_freq = pd.DataFrame(counter.most_common(), columns=["名詞", "頻度"])
     st.dataframe(df_freq, use_container_width=True, height=300)
 
-    buf_f = io.StringIO()
+    buf_f = io.BytesIO()
     df_freq.to_csv(buf_f, index=False, encoding="utf-8-sig")
     st.download_button(
         "📥 名詞頻度 CSV",
-        buf_f.getvalue().encode("utf-8-sig"),
+        buf_f.getvalue(),
         file_name=f"{prefix}_{base_name}__名詞頻度.csv",
         mime="text/csv",
         use_container_width=True,
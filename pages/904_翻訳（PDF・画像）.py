@@ -60,8 +60,9 @@ uploaded_files = st.file_uploader(
 # ============================================================
 # 抽出ユーティリティ
 # ============================================================
+@st.cache_data(show_spinner=False, max_entries=8)
 def extract_text_from_pdf(pdf_bytes: bytes) -> tuple[str, int]:
-    """テキスト抽出。戻り値: (text, num_pages)"""
+    """テキスト抽出。戻り値: (text, num_pages)（同一PDFの再実行はキャッシュ）"""
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     texts = []
     for page in doc:
@@ -125,11 +126,29 @@ def get_client() -> OpenAI:
         st.stop()
         
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def _chat_translate(model: str, system: str, text: str) -> str:
+    """
+    (model, system, text) をキーに応答をキャッシュする。
+    ダウンロード等による再実行や同一チャンクでは API を呼ばない。
+    失敗時は例外のまま返す（キャッシュされない）。
+    """
+    client = get_client()
+    resp = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": text},
+        ],
+        temperature=1,  # 一部のモデルは温度固定
+    )
+    return resp.choices[0].message.content or ""
+
+
 def translate_text(text: str, target_lang: str, preserve_formatting: bool = True) -> str:
     """
     OpenAI で翻訳。モデルは 'gpt-5-mini' を既定（必要に応じて調整）
     """
-    client = get_client()
     system = (
         "You are a professional translator. Detect the source language automatically and translate "
         f"faithfully into {target_lang}. Use formal, accurate wording."
@@ -138,15 +157,7 @@ def translate_text(text: str, target_lang: str, preserve_formatting: bool = True
         system += " Preserve paragraph breaks, lists, inline math and basic formatting as much as possible."
 
     try:
-        resp = client.chat.completions.create(
-            model="gpt-5-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": text},
-            ],
-            temperature=1,  # 一部のモデルは温度固定
-        )
-        return resp.choices[0].message.content or ""
+        return _chat_translate("gpt-5-mini", system, text)
     except Exception as e:
         st.error(f"翻訳API呼び出しに失敗: {e}")
         return ""
@@ -27,7 +27,6 @@ from __future__ import annotations
 import io
 import json
 import sys
-import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -261,6 +260,17 @@ def _split_items(
     ]
 
 
+# ============================================================
+# helpers（PDF → ページ別テキスト）
+# ============================================================
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_to_pages_text(pdf_bytes: bytes) -> List[str]:
+    # ------------------------------------------------------------
+    # 同じ PDF で抽出をやり直すときは PDF 解析を省略する
+    # ------------------------------------------------------------
+    return pdf_to_text_per_page(pdf_bytes)
+
+
 # ============================================================
 # helpers（reset）
 # ============================================================
@@ -545,10 +555,7 @@ if extract_run:
         )
         st.stop()
 
-    with tempfile.TemporaryDirectory() as td:
-        pdf_path = Path(td) / "input.pdf"
-        pdf_path.write_bytes(pdf_bytes)
-        pages_text: List[str] = pdf_to_text_per_page(pdf_path)
+    pages_text: List[str] = _pdf_to_pages_text(pdf_bytes)
 
     page_labels: List[Optional[str]] = []
     page_rows: List[Dict[str, Any]] = []
@@ -623,11 +630,11 @@ if items_saved:
 
     base_for_extract = Path(source_file_saved or "input").stem
 
-    extract_csv_buf = io.StringIO()
-    df_input_items.to_csv(extract_csv_buf, index=False)
+    extract_csv_buf = io.BytesIO()
+    df_input_items.to_csv(extract_csv_buf, index=False, encoding="utf-8-sig")
 
-    page_csv_buf = io.StringIO()
-    df_pages.to_csv(page_csv_buf, index=False)
+    page_csv_buf = io.BytesIO()
+    df_pages.to_csv(page_csv_buf, index=False, encoding="utf-8-sig")
 
     with st.sidebar:
         st.divider()
@@ -635,7 +642,7 @@ if items_saved:
 
         st.download_button(
             "📄 抽出文CSV",
-            data=extract_csv_buf.getvalue().encode("utf-8-sig"),
+            data=extract_csv_buf.getvalue(),
             file_name=f"AI図表チェック_抽出文_{base_for_extract}.csv",
             mime="text/csv",
         )
@@ -649,7 +656,7 @@ if items_saved:
 
         st.download_button(
             "📑 ページラベルCSV",
-            data=page_csv_buf.getvalue().encode("utf-8-sig"),
+            data=page_csv_buf.getvalue(),
             file_name=f"AI図表チェック_ページラベル_{base_for_extract}.csv",
             mime="text/csv",
         )
@@ -789,14 +796,14 @@ if isinstance(classify_result_saved, dict) and classify_result_saved:
 
     base_for_classify = Path(source_file_saved or "input").stem
 
-    titles_csv_buf = io.StringIO()
-    df_titles.to_csv(titles_csv_buf, index=False)
+    titles_csv_buf = io.BytesIO()
+    df_titles.to_csv(titles_csv_buf, index=False, encoding="utf-8-sig")
 
-    refs_csv_buf = io.StringIO()
-    df_refs.to_csv(refs_csv_buf, index=False)
+    refs_csv_buf = io.BytesIO()
+    df_refs.to_csv(refs_csv_buf, index=False, encoding="utf-8-sig")
 
-    unclassified_csv_buf = io.StringIO()
-    df_unclassified.to_csv(unclassified_csv_buf, index=False)
+    unclassified_csv_buf = io.BytesIO()
+    df_unclassified.to_csv(unclassified_csv_buf, index=False, encoding="utf-8-sig")
 
     classify_json_text = json.dumps(classify_result_saved, ensure_ascii=False, indent=2)
 
@@ -822,7 +829,7 @@ if isinstance(classify_result_saved, dict) and classify_result_saved:
 
         st.download_button(
             "📄 タイトル候補CSV",
-            data=titles_csv_buf.getvalue().encode("utf-8-sig"),
+            data=titles_csv_buf.getvalue(),
             file_name=f"AI図表チェック_titles_{base_for_classify}.csv",
             mime="text/csv",
             disabled=df_titles.empty,
@@ -830,7 +837,7 @@ if isinstance(classify_result_saved, dict) and classify_result_saved:
 
         st.download_button(
             "📄 参照候補CSV",
-            data=refs_csv_buf.getvalue().encode("utf-8-sig"),
+            data=refs_csv_buf.getvalue(),
             file_name=f"AI図表チェック_refs_{base_for_classify}.csv",
             mime="text/csv",
             disabled=df_refs.empty,
@@ -838,7 +845,7 @@ if isinstance(classify_result_saved, dict) and classify_result_saved:
 
         st.download_button(
             "📄 未分類CSV",
-            data=unclassified_csv_buf.getvalue().encode("utf-8-sig"),
+            data=unclassified_csv_buf.getvalue(),
             file_name=f"AI図表チェック_unclassified_{base_for_classify}.csv",
             mime="text/csv",
             disabled=df_unclassified.empty,
@@ -1144,8 +1151,8 @@ if isinstance(check_result_saved, dict) and check_result_saved:
 
     result_json_text = json.dumps(check_result_saved, ensure_ascii=False, indent=2)
 
-    csv_buf = io.StringIO()
-    df_checks.to_csv(csv_buf, index=False)
+    csv_buf = io.BytesIO()
+    df_checks.to_csv(csv_buf, index=False, encoding="utf-8-sig")
 
     with st.sidebar:
         st.divider()
@@ -1160,7 +1167,7 @@ if isinstance(check_result_saved, dict) and check_result_saved:
 
         st.download_button(
             "📄 AI照合結果（csv）",
-            data=csv_buf.getvalue().encode("utf-8-sig"),
+            data=csv_buf.getvalue(),
             file_name=f"AI図表チェック_{base}.csv",
             mime="text/csv",
             disabled=df_checks.empty,
@@ -295,6 +295,13 @@ def _add_src_info(df: pd.DataFrame, *, file: Path, sheet: Optional[str] = None,
 
 
 # ---- 正規化（最小限：空白除去/全角→半角/ローマ数字→英字/IとA混在補正/小文字化）----
+# 全角英数 → 半角 の変換表（呼び出しごとに作らない）
+_Z2H_ALNUM_TABLE = str.maketrans(
+    "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ０１２３４５６７８９",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+)
+
+
 def _norm_text(s: Optional[str]) -> str:
     if s is None:
         return ""
@@ -306,9 +313,7 @@ def _norm_text(s: Optional[str]) -> str:
     t = t.strip().replace(" ", "")
 
     # 全角英数 → 半角
-    z = "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ０１２３４５６７８９"
-    h = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
-    t = t.translate(str.maketrans(z, h))
+    t = t.translate(_Z2H_ALNUM_TABLE)
 
     # ローマ数字 → ラテン（Ⅰ/Ⅱ/Ⅲ…）
     roman_map = {
@@ -517,11 +522,11 @@ if result_df.empty:
 else:
     st.dataframe(result_df, use_container_width=True)
 
-    buf = io.StringIO()
-    result_df.to_csv(buf, index=False)
+    buf = io.BytesIO()
+    result_df.to_csv(buf, index=False, encoding="utf-8-sig")
     st.download_button(
         "📥 照合結果をCSVで保存",
-        data=buf.getvalue().encode("utf-8-sig"),
+        data=buf.getvalue(),
         file_name="redlist_match_result.csv",
         mime="text/csv",
         use_container_width=True,